@@ -0,0 +1,276 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: sin medición de memoria
+    resource = None
+
+DIRECTORIO = '.campaign_bench'
+FILAS = [1_000, 10_000, 100_000, 1_000_000]
+# Con --grande se agrega este tamaño (~1.3 GB de CSV y varios minutos por etapa)
+FILAS_GRANDE = 10_000_000
+ETAPAS = ['carga_csv', 'cache', 'carga_cache', 'kpis', 'estadisticas', 'informe', 'figuras']
+UMBRAL = 0.25
+# Por debajo de estas diferencias se considera ruido, no regresión
+MIN_SEGUNDOS = 0.05
+MIN_MB = 5.0
+# Arranque en frío (--arranque): importar cada script, sin ejecutar nada,
+# debe quedar bajo este presupuesto y sin cargar las bibliotecas pesadas,
+# que se importan recién cuando una etapa las usa
+SCRIPTS_ARRANQUE = ['pipeline', 'graficas', 'generar_informe']
+PRESUPUESTO_ARRANQUE = 0.25
+MODULOS_PESADOS = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'pyarrow']
+
+
+def memoria_pico_mb():
+    if resource is None:
+        return float('nan')
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB, macOS bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def memoria_actual_mb():
+    """RSS actual (solo Linux); None si no se puede leer."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MedidorMemoria:
+    """Pico de RSS por encima del inicial mientras corre el bloque `with`.
+
+    En Linux muestrea /proc cada pocos milisegundos, así que no depende de
+    los picos de la preparación; en otros sistemas usa ru_maxrss.
+    """
+
+    INTERVALO = 0.005
+
+    def __enter__(self):
+        self.inicial = memoria_actual_mb()
+        self.pico = self.inicial
+        self._fin = threading.Event()
+        if self.inicial is None:
+            self.inicial = memoria_pico_mb()
+        else:
+            self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+            self._hilo.start()
+        return self
+
+    def _muestrear(self):
+        while not self._fin.wait(self.INTERVALO):
+            self.pico = max(self.pico, memoria_actual_mb())
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        if self.pico is None:
+            self.mb = max(0.0, memoria_pico_mb() - self.inicial)
+        else:
+            self._hilo.join()
+            self.mb = max(self.pico, memoria_actual_mb()) - self.inicial
+
+
+def preparar(etapa, ruta):
+    """Deja el estado previo que necesita la etapa (fuera de la medición)."""
+    from campaign_analytics import cache
+    from campaign_analytics.core import Dataset
+
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(ruta)), cache.CACHE_DIR)
+    # Las tablas memoizadas de una etapa anterior harían trampa en la siguiente
+    shutil.rmtree(os.path.join(carpeta, os.path.basename(ruta) + '.tablas'), ignore_errors=True)
+    if etapa == 'cache':
+        for archivo in cache.cache_paths(ruta):
+            if os.path.exists(archivo):
+                os.remove(archivo)
+    elif cache.available():
+        cache.ensure(ruta)
+
+    if etapa == 'carga_csv':
+        from campaign_analytics import load_campaigns
+        return lambda: load_campaigns(ruta, use_cache=False)
+    if etapa == 'cache':
+        return lambda: cache.ensure(ruta)
+    if etapa == 'carga_cache':
+        from campaign_analytics import load_campaigns
+        return lambda: load_campaigns(ruta)
+    if etapa == 'kpis':
+        from campaign_analytics import KPIAccumulator, iter_chunks
+        return lambda: KPIAccumulator.from_chunks(iter_chunks(ruta))
+    if etapa == 'estadisticas':
+        import leerdatos
+
+        def estadisticas():
+            with open(os.devnull, 'w', encoding='utf-8') as salida:
+                leerdatos.resumen(Dataset(ruta), salida)
+        return estadisticas
+    if etapa == 'informe':
+        import generar_informe
+        html = os.path.splitext(ruta)[0] + '.html'
+        return lambda: generar_informe.generar_informe(Dataset(ruta), html, paginar=True)
+    if etapa == 'figuras':
+        import graficas
+        return lambda: graficas.generar_figuras(1, datos=Dataset(ruta))
+    raise ValueError(f'Etapa desconocida: {etapa!r}')
+
+
+def medir(etapa, ruta, directorio):
+    """Corre una etapa en este proceso (uno limpio por etapa) y devuelve (segundos, MB)."""
+    os.chdir(directorio)
+    funcion = preparar(etapa, ruta)
+    with MedidorMemoria() as memoria:
+        inicio = time.perf_counter()
+        funcion()
+        segundos = time.perf_counter() - inicio
+    return segundos, memoria.mb
+
+
+def dataset(directorio, filas, semilla):
+    from campaign_analytics import synthetic
+
+    ruta = os.path.join(directorio, f'campanas_{filas}_s{semilla}_v{synthetic.VERSION}.csv')
+    if not os.path.exists(ruta):
+        print(f"Generando {filas:,} filas en {ruta}...", flush=True)
+        synthetic.generate(ruta + '.tmp', filas, seed=semilla)
+        os.replace(ruta + '.tmp', ruta)
+    return os.path.abspath(ruta)
+
+
+def ejecutar(filas, etapas, semilla, repeticiones, directorio):
+    """{filas: {etapa: {'segundos', 'memoria_mb'}}}; cada medición en un proceso nuevo."""
+    contexto = multiprocessing.get_context('spawn')
+    resultados = {}
+    for n in filas:
+        ruta = dataset(directorio, n, semilla)
+        resultados[str(n)] = {}
+        for etapa in etapas:
+            medidas = []
+            for _ in range(repeticiones):
+                with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+                    medidas.append(pool.submit(medir, etapa, ruta, os.path.abspath(directorio)).result())
+            segundos = min(m[0] for m in medidas)
+            memoria = min(m[1] for m in medidas)
+            resultados[str(n)][etapa] = {'segundos': round(segundos, 4), 'memoria_mb': round(memoria, 1)}
+            print(f"{n:>12,} filas  {etapa:<13} {segundos:9.3f} s  {memoria:9.1f} MB", flush=True)
+    return resultados
+
+
+def arranque(script, repeticiones):
+    """(segundos, módulos pesados cargados) de `import script` en un intérprete nuevo.
+
+    Se conserva la mejor de `repeticiones` mediciones.
+    """
+    codigo = (f"import sys, time; inicio = time.perf_counter(); import {script}; "
+              f"print(time.perf_counter() - inicio); "
+              f"print(' '.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))")
+    base = os.path.dirname(os.path.abspath(__file__))
+    medidas = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, '-c', codigo], cwd=base, capture_output=True,
+                                text=True, check=True).stdout.splitlines()
+        medidas.append((float(salida[0]), salida[1].split() if len(salida) > 1 else []))
+    return min(medidas, key=lambda medida: medida[0])
+
+
+def revisar_arranque(repeticiones, presupuesto):
+    """Imprime el arranque de cada script; devuelve 1 si alguno se pasa del presupuesto."""
+    fallas = 0
+    for script in SCRIPTS_ARRANQUE:
+        segundos, pesados = arranque(script, repeticiones)
+        ok = segundos <= presupuesto and not pesados
+        fallas += not ok
+        detalle = f"  (carga {', '.join(pesados)})" if pesados else ''
+        print(f"{'✅' if ok else '❌'} {script:<16} {segundos:7.3f} s{detalle}", flush=True)
+    if fallas:
+        print(f"\n❌ {fallas} script(s) fuera del presupuesto de arranque ({presupuesto:.2f} s, "
+              f"sin {', '.join(MODULOS_PESADOS)})")
+        return 1
+    print(f"\n✅ Arranque dentro del presupuesto ({presupuesto:.2f} s)")
+    return 0
+
+
+def regresiones(resultados, base, umbral):
+    """Mediciones que empeoran más que `umbral` (fracción) respecto de `base`."""
+    encontradas = []
+    for n, etapas in resultados.items():
+        for etapa, medida in etapas.items():
+            previa = base.get(n, {}).get(etapa)
+            if previa is None:
+                continue
+            for clave, minimo in (('segundos', MIN_SEGUNDOS), ('memoria_mb', MIN_MB)):
+                actual, antes = medida[clave], previa[clave]
+                if actual > antes * (1 + umbral) and actual - antes > minimo:
+                    encontradas.append(f"{int(n):,} filas / {etapa} / {clave}: {antes} -> {actual} "
+                                       f"(+{(actual / antes - 1) * 100 if antes else float('inf'):.0f}%)")
+    return encontradas
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Mide tiempo y memoria de cada etapa sobre datasets sintéticos de distintos tamaños.')
+    parser.add_argument('--filas', type=lambda s: int(float(s)), nargs='+', default=FILAS,
+                        help='tamaños a medir (acepta 1e7); por defecto 1e3 a 1e6')
+    parser.add_argument('--grande', action='store_true',
+                        help=f'agrega {FILAS_GRANDE:,} filas a los tamaños medidos')
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=ETAPAS)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--repeticiones', type=int, default=1,
+                        help='se conserva la mejor de N mediciones de cada etapa')
+    parser.add_argument('--directorio', default=DIRECTORIO,
+                        help=f'dónde se guardan los datasets generados (por defecto {DIRECTORIO})')
+    parser.add_argument('--salida', help='guarda los resultados en este JSON')
+    parser.add_argument('--base', help='JSON de una medición anterior contra la que comparar')
+    parser.add_argument('--umbral', type=float, default=UMBRAL,
+                        help=f'empeoramiento tolerado respecto de --base (por defecto {UMBRAL * 100:.0f}%%)')
+    parser.add_argument('--generar', metavar='CSV',
+                        help='solo genera un dataset de --filas filas en CSV y termina')
+    parser.add_argument('--arranque', action='store_true',
+                        help='solo mide el tiempo de importar los scripts y falla si alguno pasa de '
+                             '--presupuesto o carga pandas, numpy, matplotlib, seaborn o pyarrow')
+    parser.add_argument('--presupuesto', type=float, default=PRESUPUESTO_ARRANQUE,
+                        help=f'segundos de arranque tolerados (por defecto {PRESUPUESTO_ARRANQUE})')
+    args = parser.parse_args()
+    if args.grande and FILAS_GRANDE not in args.filas:
+        args.filas = [*args.filas, FILAS_GRANDE]
+
+    if args.arranque:
+        return revisar_arranque(max(args.repeticiones, 3), args.presupuesto)
+
+    if args.generar:
+        from campaign_analytics import synthetic
+
+        synthetic.generate(args.generar, args.filas[0], seed=args.semilla)
+        print(f"✅ {args.filas[0]:,} campañas sintéticas en {args.generar}")
+        return 0
+
+    os.makedirs(args.directorio, exist_ok=True)
+    resultados = ejecutar(args.filas, args.etapas, args.semilla, args.repeticiones, args.directorio)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+
+    if args.base:
+        with open(args.base, encoding='utf-8') as f:
+            encontradas = regresiones(resultados, json.load(f), args.umbral)
+        if encontradas:
+            print(f"\n❌ Regresiones de más de {args.umbral:.0%} respecto de {args.base}:")
+            for linea in encontradas:
+                print(f"  • {linea}")
+            return 1
+        print(f"\n✅ Sin regresiones respecto de {args.base} (umbral {args.umbral:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
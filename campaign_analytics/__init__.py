@@ -0,0 +1,42 @@
+"""Utilidades compartidas para el análisis de campañas publicitarias.
+
+Los scripts del proyecto (leerdatos.py, graficas.py, generar_informe.py y
+generar_informe_v2.py) importan desde aquí la carga de datos y los KPIs para no repetir
+la misma lógica en cada uno.
+
+Los nombres de abajo se importan al pedirlos (PEP 562): importar el paquete
+o un módulo liviano (profiling, pipeline) no carga pandas ni numpy.
+"""
+
+import importlib
+
+# nombre -> módulo que lo define
+_EXPORTS = {
+    'CorrelationAccumulator': 'correlation',
+    'DATA_PATH': 'loader',
+    'DEFAULT_CHUNKSIZE': 'loader',
+    'KPIAccumulator': 'kpis',
+    'SCHEMA': 'loader',
+    'concat_chunks': 'loader',
+    'iter_chunks': 'loader',
+    'load_campaigns': 'loader',
+}
+
+__all__ = [
+    'CorrelationAccumulator',
+    'DATA_PATH',
+    'DEFAULT_CHUNKSIZE',
+    'KPIAccumulator',
+    'SCHEMA',
+    'concat_chunks',
+    'iter_chunks',
+    'load_campaigns',
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+    globals()[name] = value
+    return value
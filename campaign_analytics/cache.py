@@ -0,0 +1,236 @@
+"""Caché columnar (Arrow/Feather) del dataset de campañas.
+
+La primera lectura de un CSV lo convierte, bloque a bloque, a un archivo
+Arrow IPC (Feather v2) con el mismo esquema tipado del loader. Las lecturas
+siguientes abren ese archivo con memory-map y no vuelven a parsear texto ni
+fechas.
+
+La caché se invalida cuando cambia el tamaño del CSV. Si solo cambió la fecha
+de modificación (por ejemplo, el archivo se volvió a copiar) se compara el
+hash del contenido antes de reconstruirla. pyarrow es opcional: sin él la
+caché queda deshabilitada y el loader lee el CSV directamente. Se importa
+recién cuando se usa la caché.
+"""
+
+import functools
+import hashlib
+import io
+import json
+import os
+
+from campaign_analytics import profiling
+from campaign_analytics.loader import CATEGORY_COLUMNS, DEFAULT_CHUNKSIZE, SCHEMA, read_csv_chunks
+
+CACHE_DIR = os.environ.get('CAMPANAS_CACHE_DIR', '.campaign_cache')
+CACHE_ENABLED = os.environ.get('CAMPANAS_CACHE', '1') != '0'
+
+_HASH_BLOCK = 1 << 20
+# Cambia si cambia el esquema del loader, para no servir una caché con tipos viejos
+SCHEMA_VERSION = hashlib.sha1(json.dumps(SCHEMA, sort_keys=True).encode()).hexdigest()[:12]
+
+
+@functools.cache
+def _pyarrow():
+    """El módulo pyarrow, o None si no está instalado."""
+    try:
+        import pyarrow
+    except ImportError:  # pragma: no cover - depende del entorno
+        return None
+    return pyarrow
+
+
+def available():
+    return CACHE_ENABLED and _pyarrow() is not None
+
+
+def cache_paths(source):
+    """Rutas (datos, metadatos) de la caché asociada a `source`."""
+    folder = os.path.join(os.path.dirname(os.path.abspath(source)), CACHE_DIR)
+    name = os.path.basename(source)
+    return os.path.join(folder, name + '.arrow'), os.path.join(folder, name + '.meta.json')
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _HashingReader(io.RawIOBase):
+    """Archivo binario que va hasheando lo que se lee (igual que `file_digest`).
+
+    Así el CSV se lee una sola vez al construir la caché: el parser consume
+    los bytes y el hash del contenido sale de la misma lectura.
+    """
+
+    def __init__(self, path):
+        self.raw = open(path, 'rb')
+        self.digest = hashlib.blake2b(digest_size=16)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        if n:
+            self.digest.update(memoryview(buffer)[:n])
+        return n
+
+    def hexdigest(self):
+        """Hash de todo el archivo (lee lo que el parser haya dejado sin consumir)."""
+        for block in iter(lambda: self.raw.read(_HASH_BLOCK), b''):
+            self.digest.update(block)
+        return self.digest.hexdigest()
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+def _arrow_schema():
+    pa = _pyarrow()
+    types = {
+        'datetime64[ns]': pa.timestamp('ns'),
+        'object': pa.string(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'int32': pa.int32(),
+        'float32': pa.float32(),
+        'float64': pa.float64(),
+    }
+    return pa.schema([(col, types[dtype]) for col, dtype in SCHEMA.items()])
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp = meta_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def is_valid(source):
+    """True si la caché de `source` existe y corresponde al CSV actual."""
+    data_path, meta_path = cache_paths(source)
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(data_path):
+        return False
+    if meta.get('schema') != SCHEMA_VERSION:
+        return False
+    stat = os.stat(source)
+    if stat.st_size != meta.get('size'):
+        return False
+    if stat.st_mtime_ns == meta.get('mtime_ns'):
+        return True
+    # Mismo tamaño, otra fecha: decide el contenido
+    if file_digest(source) != meta.get('digest'):
+        return False
+    meta['mtime_ns'] = stat.st_mtime_ns
+    _write_meta(meta_path, meta)
+    return True
+
+
+def _open_table(source):
+    pa = _pyarrow()
+    data_path, _ = cache_paths(source)
+    return pa.ipc.open_file(pa.memory_map(data_path, 'r')).read_all()
+
+
+def read_cached(source, chunksize, columns=None):
+    """Recorre la caché en bloques de `chunksize` filas (sin copiar el archivo)."""
+    table = _open_table(source)
+    if columns is not None:
+        table = table.select([col for col in SCHEMA if col in columns])
+    text_columns = [col for col in table.column_names if SCHEMA[col] == 'object']
+    for offset in range(0, table.num_rows, chunksize):
+        chunk = table.slice(offset, chunksize).to_pandas()
+        # Arrow devuelve texto como dtype str; se respeta el esquema del loader
+        for col in text_columns:
+            chunk[col] = chunk[col].astype(object)
+        yield chunk
+
+
+def _align_categories(chunk, known):
+    """Extiende las categorías de forma acumulativa (solo se agregan al final).
+
+    Así el diccionario de cada bloque es prefijo del siguiente y Arrow lo
+    escribe como delta en lugar de reemplazarlo (no permitido en archivos IPC).
+    """
+    for col in CATEGORY_COLUMNS:
+        new = [value for value in chunk[col].cat.categories if value not in known[col]]
+        known[col].extend(sorted(new))
+        chunk[col] = chunk[col].cat.set_categories(known[col])
+    return chunk
+
+
+def build_and_iter(source, chunksize, columns=None):
+    """Parsea el CSV por bloques, los entrega y a la vez escribe la caché.
+
+    La caché solo se publica si el recorrido termina; un consumidor que se
+    detenga a mitad de camino no deja un archivo incompleto.
+    """
+    pa = _pyarrow()
+    data_path, meta_path = cache_paths(source)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    stat = os.stat(source)
+    schema = _arrow_schema()
+    known = {col: [] for col in CATEGORY_COLUMNS}
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    tmp_path = f'{data_path}.{os.getpid()}.tmp'
+    completed = False
+    rows = 0
+    reader = _HashingReader(source)
+    try:
+        with pa.ipc.new_file(tmp_path, schema, options=options) as writer:
+            for chunk in read_csv_chunks(reader, chunksize):
+                rows += len(chunk)
+                with profiling.stage('cache.escritura', len(chunk)):
+                    chunk = _align_categories(chunk, known)
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield chunk if columns is None else chunk[[col for col in SCHEMA if col in columns]]
+        completed = True
+    finally:
+        if completed:
+            os.replace(tmp_path, data_path)
+            _write_meta(meta_path, {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'digest': reader.hexdigest(),
+                'schema': SCHEMA_VERSION,
+                'rows': rows,
+            })
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        reader.close()
+
+
+def iter_chunks(source, chunksize, columns=None):
+    """Bloques desde la caché si es válida; si no, la reconstruye al leer."""
+    if is_valid(source):
+        return read_cached(source, chunksize, columns)
+    return build_and_iter(source, chunksize, columns)
+
+
+def ensure(source, chunksize=None):
+    """Construye la caché de `source` si hace falta y devuelve su número de filas.
+
+    Útil antes de repartir trabajo entre procesos: así ninguno la reconstruye
+    por su cuenta. Con un directorio o un glob se preparan todos sus
+    archivos en paralelo (campaign_analytics.ingest).
+    """
+    from campaign_analytics import ingest
+
+    if ingest.is_multi(source):
+        return sum(stats.rows for stats in ingest.prepare(source, chunksize))
+    if not is_valid(source):
+        return sum(len(chunk) for chunk in build_and_iter(source, chunksize or DEFAULT_CHUNKSIZE))
+    rows = _read_meta(cache_paths(source)[1]).get('rows')
+    return rows if rows is not None else _open_table(source).num_rows
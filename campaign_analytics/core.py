@@ -0,0 +1,344 @@
+"""Tablas derivadas del dataset, calculadas una sola vez por versión del archivo.
+
+Los scripts repetían las mismas agregaciones: el ROAS por plataforma
+(graficas.py y los dos informes), la matriz de correlación (leerdatos.py y
+graficas.py) y el bloque de KPIs. Aquí cada tabla se declara una vez en
+TABLES y `Dataset.table` la memoiza con la huella del archivo (tamaño, fecha
+de modificación y esquema del loader):
+
+- dentro de un proceso, en memoria;
+- entre procesos (los workers de graficas.py, o leerdatos.py seguido de los
+  informes), en un pickle junto a la caché columnar, salvo las tablas del
+  tamaño del dataset, que no vale la pena escribir.
+
+Las tablas marcadas con `streaming` reciben en vez del DataFrame una
+función que devuelve los bloques del dataset (la carga ya hecha, si la hay,
+o `iter_chunks`), así que se pueden calcular sin tener todo en memoria. Las
+que declaran `source` se calculan a partir de otra tabla: los resúmenes por
+plataforma, tipo y audiencia salen del cubo OLAP (`campaign_cube`, ver
+campaign_analytics.cube).
+
+`Dataset.segments` parte el dataset por una dimensión (plataforma, tipo,
+audiencia) en `Segment`s con las mismas tablas, calculadas solo en memoria;
+así salen los informes por segmento de generar_informe.py.
+
+Si el CSV cambia, cambia la huella y todo se recalcula. Con CAMPANAS_CACHE=0
+no se escribe nada en disco.
+
+Los módulos de cálculo (correlación, outliers, almacén, series de tiempo) se
+importan dentro de la función de cada tabla: abrir un Dataset o calcular su
+huella no carga numpy ni pandas.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+
+from campaign_analytics import cube, ingest, profiling
+from campaign_analytics.cache import CACHE_DIR, CACHE_ENABLED, SCHEMA_VERSION
+from campaign_analytics.kpis import COLUMNS as KPI_COLUMNS, KPIAccumulator
+from campaign_analytics.loader import DATA_PATH, DERIVE_METRICS, SCHEMA, iter_chunks, load_campaigns
+from campaign_analytics.metrics import DERIVED_METRICS, INPUT_COLUMNS, mismatch_summary
+
+# Súbase al cambiar el cálculo de alguna tabla, para no servir pickles viejos
+TABLES_VERSION = 8
+
+NUMERIC_COLUMNS = [col for col, dtype in SCHEMA.items() if dtype.startswith(('int', 'float'))]
+CAMPAIGN_SUMMARY_COLUMNS = ['campana_id', 'plataforma', 'tipo_campana', 'impresiones', 'conversiones',
+                            'costo_total', 'revenue_generado', 'roas', 'cpa']
+
+# nombre -> (función, columnas que necesita, se guarda en disco, recibe bloques, tabla de origen)
+TABLES = {}
+
+
+def derived(name, columns=None, persist=True, streaming=False, source=None):
+    """Registra `func(df)` como la tabla derivada `name`.
+
+    Con `streaming` la función recibe `chunks` (ver arriba); con `source`,
+    el valor de esa otra tabla.
+    """
+    def register(func):
+        TABLES[name] = (func, columns, persist, streaming, source)
+        return func
+    return register
+
+
+@derived('kpis', KPI_COLUMNS, streaming=True)
+def _kpis(chunks):
+    return KPIAccumulator.from_chunks(chunks())
+
+
+@derived('campaign_cube', cube.DIMENSIONS + cube.MEASURES, streaming=True)
+def _campaign_cube(chunks):
+    return cube.build(chunks())
+
+
+@derived('platform_summary', persist=False, source='campaign_cube')
+def _platform_summary(campaign_cube):
+    summary = campaign_cube.sum('plataforma', ['revenue_generado', 'costo_total', 'conversiones',
+                                               'presupuesto_diario'])
+    summary['ROAS'] = summary['revenue_generado'] / summary['costo_total']
+    return summary
+
+
+@derived('campaign_type_summary', persist=False, source='campaign_cube')
+def _campaign_type_summary(campaign_cube):
+    summary = campaign_cube.sum('tipo_campana', ['conversiones', 'revenue_generado', 'costo_total'])
+    summary['ROAS'] = summary['revenue_generado'] / summary['costo_total']
+    return summary
+
+
+@derived('audience_engagement', persist=False, source='campaign_cube')
+def _audience_engagement(campaign_cube):
+    return campaign_cube.mean('audiencia_objetivo', 'engagement_rate')['engagement_rate']
+
+
+@derived('daily_summary', persist=False, source='campaign_cube')
+def _daily_summary(campaign_cube):
+    from campaign_analytics import timeseries
+
+    return timeseries.daily(campaign_cube)
+
+
+@derived('correlation', NUMERIC_COLUMNS, streaming=True)
+def _correlation(chunks):
+    from campaign_analytics.correlation import streaming_corr
+
+    return streaming_corr(chunks, 'pearson')
+
+
+@derived('spearman_correlation', NUMERIC_COLUMNS, streaming=True)
+def _spearman_correlation(chunks):
+    from campaign_analytics.correlation import streaming_corr
+
+    return streaming_corr(chunks, 'spearman')
+
+
+@derived('outliers', NUMERIC_COLUMNS, streaming=True)
+def _outliers(chunks):
+    from campaign_analytics.outliers import streaming_outliers
+
+    return streaming_outliers(chunks)
+
+
+@derived('metric_mismatches', INPUT_COLUMNS + list(DERIVED_METRICS), streaming=True)
+def _metric_mismatches(chunks):
+    return mismatch_summary(chunks())
+
+
+@derived('data_quality', streaming=True)
+def _data_quality(chunks):
+    from campaign_analytics.quality import DataQuality
+
+    return DataQuality.from_chunks(chunks())
+
+
+@derived('dataset_summary', persist=False, streaming=True)
+def _dataset_summary(chunks):
+    # Sin persistir: las frecuencias de campana_id son del tamaño del dataset
+    from campaign_analytics.describe import streaming_summary
+
+    return streaming_summary(chunks)
+
+
+@derived('campaign_store', streaming=True)
+def _campaign_store(chunks):
+    from campaign_analytics.records import CampaignStore
+
+    return CampaignStore.from_chunks(chunks())
+
+
+@derived('campaigns_by_roas', persist=False, source='campaign_store')
+def _campaigns_by_roas(store):
+    # Orden estable: en empates de ROAS queda primero la campaña anterior en el archivo
+    return store.to_frame(store.order('roas', ascending=False), CAMPAIGN_SUMMARY_COLUMNS)
+
+
+def fingerprint(path):
+    """Huella barata de la versión del archivo (sin leer su contenido).
+
+    Con un directorio o un glob combina el tamaño y la fecha de cada
+    archivo: agregar, quitar o modificar cualquiera cambia la huella.
+    """
+    files = ingest.sources(path)
+    stats = [os.stat(file) for file in files] if ingest.is_multi(path) else [os.stat(path)]
+    versions = ';'.join(f'{os.path.abspath(file)}|{stat.st_size}|{stat.st_mtime_ns}'
+                        for file, stat in zip(files, stats))
+    key = f'{versions}|{SCHEMA_VERSION}|{TABLES_VERSION}|{DERIVE_METRICS}'
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+class Dataset:
+    """Un archivo de campañas con sus tablas derivadas memoizadas.
+
+    `frame(columns)` reutiliza cualquier carga previa que ya tenga esas
+    columnas; `table(name)` calcula cada tabla de TABLES a lo sumo una vez.
+    Se puede compartir entre hilos (las etapas del pipeline): cada tabla (y
+    cada carga) tiene su propio lock, así que dos hilos no calculan la misma
+    tabla dos veces pero tablas distintas se calculan en paralelo.
+    """
+
+    def __init__(self, path=DATA_PATH):
+        self.path = path
+        self.fingerprint = fingerprint(path)
+        self.frames = {}
+        self.tables = {}
+        self._init_locks()
+
+    def _init_locks(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+
+    def _lock_for(self, key):
+        """Lock propio de `key` (una tabla o un juego de columnas), creado al pedirlo."""
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_lock'], state['_locks']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_locks()
+
+    def _loaded(self, columns):
+        wanted = set(columns) if columns is not None else set(SCHEMA)
+        for loaded, df in self.frames.items():
+            if wanted <= set(loaded):
+                return df if wanted == set(loaded) else df[[col for col in df.columns if col in wanted]]
+        return None
+
+    def frame(self, columns=None):
+        with self._lock_for(('frame', frozenset(columns) if columns is not None else None)):
+            df = self._loaded(columns)
+            if df is not None:
+                return df
+            df = load_campaigns(self.path, columns=columns)
+            self.frames[tuple(df.columns)] = df
+            return df
+
+    def chunks(self, columns=None):
+        """Bloques con `columns`: la carga en memoria si existe, si no `iter_chunks`."""
+        df = self._loaded(columns)
+        return iter([df]) if df is not None else iter_chunks(self.path, columns=columns)
+
+    def _table_path(self, name):
+        folder = os.path.join(ingest.source_folder(self.path), CACHE_DIR,
+                              ingest.source_name(self.path) + '.tablas', self.fingerprint)
+        return os.path.join(folder, name + '.pkl')
+
+    def _load_table(self, name):
+        try:
+            with open(self._table_path(name), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store_table(self, name, value):
+        path = self._table_path(name)
+        folder = os.path.dirname(path)
+        # Las tablas de versiones anteriores del archivo ya no sirven
+        parent = os.path.dirname(folder)
+        if os.path.isdir(parent):
+            for old in os.listdir(parent):
+                if old != self.fingerprint:
+                    shutil.rmtree(os.path.join(parent, old), ignore_errors=True)
+        os.makedirs(folder, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def table(self, name):
+        with self._lock_for(name):
+            return self._table(name)
+
+    def _table(self, name):
+        if name in self.tables:
+            return self.tables[name]
+        func, columns, persist, streaming, source = TABLES[name]
+        persist = persist and CACHE_ENABLED
+        value = self._load_table(name) if persist else None
+        if value is None:
+            if source is not None:
+                value = func(self.table(source))
+            elif streaming:
+                with profiling.stage(f'tabla:{name}'):
+                    value = func(lambda: self.chunks(columns))
+            else:
+                df = self.frame(columns)
+                with profiling.stage(f'tabla:{name}', len(df)):
+                    value = func(df)
+            if persist:
+                self._store_table(name, value)
+        self.tables[name] = value
+        return value
+
+    def top(self, col, k, largest=True, columns=CAMPAIGN_SUMMARY_COLUMNS):
+        """Las `k` campañas de mayor (o menor) `col`, de la más a la menos extrema.
+
+        Sale del almacén compacto (`campaign_store`) en O(n), sin ordenar
+        todas las campañas.
+        """
+        store = self.table('campaign_store')
+        return store.to_frame(store.top_k(col, k, largest), columns)
+
+    def segments(self, key):
+        """{valor: Segment} con las filas de cada valor de `key`.
+
+        El dataset se carga una vez y se parte con un solo groupby; cada
+        segmento calcula después sus tablas sin volver a leer el archivo.
+        """
+        segments = {}
+        for value, group in self.frame().groupby(key, observed=True, sort=True):
+            group = group.reset_index(drop=True)
+            # Sin las categorías de otros segmentos (no aparecen como filas vacías)
+            for col in group.select_dtypes('category'):
+                group[col] = group[col].cat.remove_unused_categories()
+            segments[value] = Segment(self, key, value, group)
+        return segments
+
+
+class Segment(Dataset):
+    """Las filas de un Dataset con un mismo valor de `key` (ver `Dataset.segments`).
+
+    Sus tablas se calculan en memoria sobre ese DataFrame y no se guardan en
+    disco. Se puede mandar a otro proceso: lleva sus filas consigo.
+    """
+
+    def __init__(self, parent, key, value, df):
+        self.path = parent.path
+        self.fingerprint = parent.fingerprint
+        self.key = key
+        self.value = value
+        self.frames = {tuple(df.columns): df}
+        self.tables = {}
+        self._init_locks()
+
+    def frame(self, columns=None):
+        return self._loaded(columns)
+
+    def chunks(self, columns=None):
+        return iter([self._loaded(columns)])
+
+    def _load_table(self, name):
+        return None
+
+    def _store_table(self, name, value):
+        pass
+
+
+_DATASETS = {}
+
+
+def open_dataset(path=DATA_PATH):
+    """Dataset de `path`, compartido dentro del proceso mientras el archivo no cambie."""
+    key = os.path.abspath(path)
+    dataset = _DATASETS.get(key)
+    if dataset is None or dataset.fingerprint != fingerprint(path):
+        dataset = _DATASETS[key] = Dataset(path)
+    return dataset
@@ -0,0 +1,154 @@
+"""Matriz de correlación en una sola pasada, combinable entre bloques.
+
+`CorrelationAccumulator` guarda, por cada par de columnas, las filas en que
+ambas tienen valor, sus medias y los co-momentos centrados, y combina
+bloques (o particiones de otros procesos) con la fórmula de Chan para la
+varianza en paralelo (la generalización de Welford a grupos). Como
+`DataFrame.corr`, cada par usa solo las filas donde las dos columnas tienen
+valor, así que el resultado coincide con pandas salvo redondeo, sin tener
+nunca todo el dataset en memoria.
+
+Spearman es Pearson sobre los rangos. `RankSketches` estima el rango de
+cada valor con un `QuantileSketch` por columna (los mismos
+`outliers.ColumnSketches` que los cuartiles de los outliers, primera pasada) y
+`streaming_corr` acumula Pearson sobre esos rangos (segunda pasada).
+Mientras el sketch no compacte (hasta unos miles de valores por columna)
+los rangos son exactos, con empates promediados como en pandas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.outliers import SKETCH_SIZE, ColumnSketches, _numeric_matrix
+
+METHODS = ('pearson', 'spearman')
+
+
+class CorrelationAccumulator:
+    """Covarianza y correlación por pares de columnas, bloque a bloque.
+
+    Matrices p x p (p columnas), para el par (i, j):
+
+    - `n[i, j]`: filas con valor en i y en j;
+    - `means[i, j]`: media de i sobre esas filas;
+    - `comoment[i, j]`: suma de productos de desvíos de i y j;
+    - `squares[i, j]`: suma de desvíos al cuadrado de i sobre esas filas.
+
+    Sin valores faltantes todas las filas de `means` y `squares` son iguales.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = list(columns) if columns is not None else None
+        self.n = self.means = self.comoment = self.squares = None
+
+    @classmethod
+    def from_chunks(cls, chunks, columns=None):
+        acc = cls(columns)
+        for chunk in chunks:
+            acc.update(chunk)
+        return acc
+
+    def _empty(self, p):
+        self.n = np.zeros((p, p))
+        self.means = np.zeros((p, p))
+        self.comoment = np.zeros((p, p))
+        self.squares = np.zeros((p, p))
+
+    def update(self, chunk):
+        """Incorpora un bloque (DataFrame); usa sus columnas numéricas si no se dieron."""
+        columns, values = _numeric_matrix(chunk, self.columns)
+        return self.update_values(values, columns)
+
+    def update_values(self, values, columns=None):
+        """Incorpora una matriz 2D (filas x columnas) de valores."""
+        if self.columns is None:
+            self.columns = list(columns)
+        if self.n is None:
+            self._empty(len(self.columns))
+        values = np.asarray(values, dtype='float64')
+        if len(values) == 0:
+            return self
+        valid = ~np.isnan(values)
+        mask = valid.astype('float64')
+        filled = np.where(valid, values, 0.0)
+        # Se desplaza por la media del bloque: los productos quedan chicos y
+        # las restas de abajo no pierden precisión
+        counts = mask.sum(axis=0)
+        shift = np.divide(filled.sum(axis=0), counts, out=np.zeros_like(counts), where=counts > 0)
+        centered = np.where(valid, filled - shift, 0.0)
+        n = mask.T @ mask
+        means = np.divide(centered.T @ mask, n, out=np.zeros_like(n), where=n > 0)
+        comoment = centered.T @ centered - n * means * means.T
+        squares = (centered * centered).T @ mask - n * means * means
+        return self._combine(n, means + shift[:, None], comoment, squares)
+
+    def merge(self, other):
+        """Combina el acumulador de otra partición en este."""
+        if other.n is None:
+            return self
+        if self.columns is None:
+            self.columns = list(other.columns)
+            self._empty(len(self.columns))
+        if other.columns != self.columns:
+            raise ValueError(f"Columnas distintas: {self.columns} vs {other.columns}")
+        return self._combine(other.n, other.means, other.comoment, other.squares)
+
+    def _combine(self, n_b, means_b, comoment_b, squares_b):
+        n = self.n + n_b
+        share = np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+        weight = self.n * share
+        delta = means_b - self.means
+        self.means = self.means + delta * share
+        self.comoment = self.comoment + comoment_b + delta * delta.T * weight
+        self.squares = self.squares + squares_b + delta * delta * weight
+        self.n = n
+        return self
+
+    def covariance(self, ddof=1):
+        """Matriz de covarianza (como `DataFrame.cov`)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = np.where(self.n > ddof, self.comoment / (self.n - ddof), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Matriz de correlación de Pearson (como `DataFrame.corr`)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.squares * self.squares.T)
+        corr[(self.n < 2) | ~np.isfinite(corr)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        # La diagonal es 1 exacto salvo columnas constantes o vacías
+        diagonal = np.diag(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+class RankSketches(ColumnSketches):
+    """Rango aproximado de cada valor, con un `QuantileSketch` por columna."""
+
+    def transform(self, chunk):
+        """Matriz de rangos del bloque: fracción de valores menores más la mitad de los iguales."""
+        _, values = _numeric_matrix(chunk, self.columns)
+        ranks = np.full(values.shape, np.nan)
+        for i, col in enumerate(self.columns):
+            sketch, column = self.sketches[col], values[:, i]
+            valid = ~np.isnan(column)
+            ranks[valid, i] = (sketch.rank(column[valid]) + sketch.rank(column[valid], inclusive=True)) / 2
+        return ranks
+
+
+def streaming_corr(chunks, method='pearson', columns=None, k=SKETCH_SIZE):
+    """Correlación de los bloques que entrega `chunks()` (se llama una vez por pasada).
+
+    Pearson recorre los datos una vez; Spearman dos (sketches y rangos).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método desconocido: {method!r} (se esperaba uno de {METHODS})")
+    if method == 'pearson':
+        return CorrelationAccumulator.from_chunks(chunks(), columns).correlation()
+    sketches = RankSketches(columns, k)
+    for chunk in chunks():
+        sketches.update(chunk)
+    acc = CorrelationAccumulator(sketches.columns)
+    for chunk in chunks():
+        acc.update_values(sketches.transform(chunk))
+    return acc.correlation()
@@ -0,0 +1,54 @@
+"""Cubo OLAP de campañas: plataforma x tipo x audiencia x día.
+
+Todos los análisis del proyecto son cortes de las mismas cuatro dimensiones.
+`build` recorre el dataset una vez y deja en un `GroupCube` denso las sumas
+de las medidas aditivas por cada combinación de dimensiones (unas 40.000
+celdas para un año de datos, sin importar cuántas filas haya). Cualquier
+agrupación o filtro por esas dimensiones sale luego del cubo sin volver a
+leer filas:
+
+    cubo = datos.table('campaign_cube')
+    query(cubo, 'plataforma')                                  # sumas + ROAS, CTR, CPA...
+    query(cubo, ['tipo_campana', 'audiencia_objetivo'], plataforma='TikTok Ads')
+    query(cubo, 'fecha_campana', fecha_campana=lambda d: d.month == 3)
+
+Las tasas se calculan como razón de sumas (`with_ratios`), nunca como
+promedio de las tasas de cada fila. engagement_rate no es aditiva: se guarda
+su suma y su conteo, así que lo que se puede pedir es el promedio por
+campaña (`cubo.mean`).
+
+En disco el cubo guarda solo las celdas con campañas (ver
+`GroupCube.__getstate__`).
+"""
+
+from campaign_analytics.metrics import DERIVED_METRICS, derive
+
+DIMENSIONS = ['plataforma', 'tipo_campana', 'audiencia_objetivo', 'fecha_campana']
+MEASURES = ['impresiones', 'clicks', 'conversiones', 'costo_total', 'revenue_generado', 'alcance',
+            'presupuesto_diario', 'engagement_rate']
+
+
+def build(chunks, dimensions=DIMENSIONS, measures=MEASURES):
+    """Cubo de los bloques de `chunks` (un iterable de DataFrames)."""
+    # Importado aquí: el núcleo solo necesita DIMENSIONS y MEASURES al arrancar
+    from campaign_analytics.groupby import GroupCube
+
+    return GroupCube.from_chunks(chunks, dimensions, measures)
+
+
+def with_ratios(summary):
+    """Agrega a un resumen de sumas las tasas de DERIVED_METRICS que se puedan calcular."""
+    metrics = [metric for metric, (num, den, _, _) in DERIVED_METRICS.items()
+               if num in summary.columns and den in summary.columns]
+    if metrics:
+        summary = summary.join(derive(summary, metrics))
+    return summary
+
+
+def query(cube, by, measures=None, ratios=True, **where):
+    """Sumas de `measures` por `by` sobre el corte `where` (ver `GroupCube.where`)."""
+    if where:
+        cube = cube.where(**where)
+    measures = [col for col in cube.columns if col != 'engagement_rate'] if measures is None else measures
+    summary = cube.sum(by, measures)
+    return with_ratios(summary) if ratios else summary
@@ -0,0 +1,211 @@
+"""Resumen descriptivo del dataset (lo que imprime leerdatos.py), por bloques.
+
+leerdatos.py mostraba forma, primeras filas, tipos, `describe()`, desvío
+estándar y frecuencias de las categóricas de un DataFrame con las 19
+columnas cargadas. `streaming_summary` arma lo mismo recorriendo los
+bloques, con un solo bloque en memoria:
+
+- conteo, media, desvío, mínimo y máximo de cada columna numérica se
+  combinan entre bloques (Chan et al.), sin volver a recorrer las filas;
+- los cuartiles salen de un `QuantileSketch` por columna (ver
+  campaign_analytics.outliers), así que con varios bloques son aproximados;
+- las frecuencias de las columnas categóricas y de texto se suman bloque a
+  bloque, en el orden de primera aparición como `value_counts`. Las de
+  campana_id, con tantos valores como filas, se cuentan sobre el número de
+  CAMP-<n> (como en campaign_analytics.records) y los textos se arman al
+  final, con pyarrow si está instalado, en un solo array compacto.
+
+Con un solo bloque (el dataset ya cargado o un archivo chico) todo se
+calcula con pandas sobre ese bloque y coincide exactamente con `describe`.
+"""
+
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics import cache
+from campaign_analytics.groupby import value_counts
+from campaign_analytics.loader import concat_chunks
+from campaign_analytics.outliers import SKETCH_SIZE, QuantileSketch
+from campaign_analytics.records import ID_COLUMN, ID_PREFIX, _encode_ids
+
+HEAD_ROWS = 5
+QUANTILES = (0.25, 0.5, 0.75)
+_QUANTILE_NAMES = ['25%', '50%', '75%']
+
+
+class DatasetSummary:
+    """Forma, tipos, primeras filas, `describe`, desvío y frecuencias del dataset."""
+
+    def __init__(self, n_rows, dtypes, head, stats, counts):
+        self.n_rows = n_rows
+        self.dtypes = dtypes
+        self.head = head
+        self.stats = stats
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, df):
+        """Resumen exacto de un DataFrame completo."""
+        text = df.select_dtypes(include=['object', 'category']).columns
+        return cls(len(df), df.dtypes, df.head(HEAD_ROWS), df.describe(),
+                   {col: value_counts(df[col]) for col in text})
+
+    @property
+    def shape(self):
+        return self.n_rows, len(self.dtypes)
+
+    @property
+    def columns(self):
+        return self.dtypes.index.tolist()
+
+    def _numeric(self, row):
+        numeric = [col for col in self.stats.columns if pd.api.types.is_numeric_dtype(self.dtypes[col])]
+        return self.stats.loc[row, numeric].astype('float64').rename(None)
+
+    @property
+    def mean(self):
+        return self._numeric('mean')
+
+    @property
+    def std(self):
+        return self._numeric('std')
+
+
+class _Moments:
+    """Conteo, media, suma de cuadrados centrada, mínimo y máximo por columna."""
+
+    def __init__(self, n_columns):
+        self.n = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.min = np.full(n_columns, math.inf)
+        self.max = np.full(n_columns, -math.inf)
+
+    def update(self, values):
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=0)
+        present = n > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(present, np.nansum(values, axis=0) / n, 0.0)
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+        total = self.n + n
+        delta = mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = np.where(present, self.mean + delta * n / total, self.mean)
+            self.m2 = np.where(present, self.m2 + m2 + delta ** 2 * self.n * n / total, self.m2)
+        self.n = total
+        if len(values):
+            self.min = np.minimum(self.min, np.where(valid, values, math.inf).min(axis=0))
+            self.max = np.maximum(self.max, np.where(valid, values, -math.inf).max(axis=0))
+        return self
+
+    def range(self):
+        return np.where(self.n > 0, self.min, math.nan), np.where(self.n > 0, self.max, math.nan)
+
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), math.nan)
+
+
+def _seconds(values):
+    """Fechas como segundos desde 1970 (exactos en float64); NaT pasa a NaN."""
+    values = values.to_numpy('datetime64[s]')
+    seconds = values.astype('int64').astype('float64')
+    seconds[np.isnat(values)] = math.nan
+    return seconds
+
+
+def _id_counts(ids):
+    """Frecuencias de un bloque de ids: por número si todos son CAMP-<n>, si no por texto."""
+    numbers, table = _encode_ids(ids)
+    if table is not None:
+        return value_counts(ids)
+    codes, uniques = pd.factorize(numbers)
+    return pd.Series(np.bincount(codes, minlength=len(uniques)), index=uniques, name='count')
+
+
+def _id_labels(numbers):
+    """Index con CAMP-<n> de cada número (en Arrow si se puede: un objeto por id pesa mucho)."""
+    pa = cache._pyarrow()
+    if pa is None:
+        return pd.Index(np.char.add(ID_PREFIX, numbers.astype(str)).astype(object), name=ID_COLUMN)
+    import pyarrow.compute as pc
+
+    labels = pc.binary_join_element_wise(ID_PREFIX, pc.cast(pa.array(numbers), pa.string()), '')
+    return pd.Index(pd.arrays.ArrowStringArray(labels), name=ID_COLUMN)
+
+
+def _total_id_counts(parts):
+    if any(not pd.api.types.is_integer_dtype(part.index) for part in parts):
+        # Algún bloque trajo ids con otra forma: se suma todo por texto
+        parts = [part if not pd.api.types.is_integer_dtype(part.index)
+                 else part.set_axis(pd.Index(ID_PREFIX + part.index.astype(str), name=ID_COLUMN))
+                 for part in parts]
+        return _total_counts(parts, categorical=False)
+    counts = pd.concat(parts).groupby(level=0, sort=False).sum().sort_values(ascending=False, kind='stable')
+    return pd.Series(counts.to_numpy(), index=_id_labels(counts.index.to_numpy()), name='count')
+
+
+def _total_counts(parts, categorical):
+    """Suma las frecuencias de cada bloque, en el orden de primera aparición."""
+    counts = pd.concat(parts).groupby(level=0, sort=False, observed=True).sum()
+    if not categorical:
+        return counts.sort_values(ascending=False, kind='stable')
+    # Como concat_chunks: las categorías de todos los bloques, ordenadas
+    counts.index = counts.index.astype(str)
+    levels = counts.index.sort_values()
+    index = pd.CategoricalIndex(levels, categories=levels, name=counts.index.name)
+    return pd.Series(counts.reindex(levels).to_numpy(dtype='int64'), index=index, name='count') \
+        .sort_values(ascending=False, kind='stable')
+
+
+def streaming_summary(chunks, sketch_size=SKETCH_SIZE):
+    """`DatasetSummary` de los bloques que entrega `chunks()` (ver arriba)."""
+    blocks = chunks()
+    first = next(blocks, None)
+    second = next(blocks, None) if first is not None else None
+    if second is None:
+        return DatasetSummary.from_frame(first if first is not None else concat_chunks([]))
+    numeric = first.select_dtypes(include=[np.number]).columns.tolist()
+    dates = first.select_dtypes(include=['datetime']).columns.tolist()
+    text = first.select_dtypes(include=['object', 'category']).columns.tolist()
+    measured = dates + numeric
+    moments = _Moments(len(measured))
+    sketches = [QuantileSketch(sketch_size, seed=i) for i in range(len(measured))]
+    counts = {col: [] for col in text}
+    n_rows = 0
+    for chunk in itertools.chain([first, second], blocks):
+        n_rows += len(chunk)
+        values = np.column_stack([_seconds(chunk[col]) for col in dates]
+                                 + [chunk[col].to_numpy(dtype='float64', na_value=np.nan) for col in numeric])
+        moments.update(values)
+        for i, sketch in enumerate(sketches):
+            sketch.update(values[:, i])
+        for col in text:
+            counts[col].append(_id_counts(chunk[col]) if col == ID_COLUMN else value_counts(chunk[col]))
+
+    quartiles = [sketch.quantile(QUANTILES) for sketch in sketches]
+    std = moments.std()
+    low, high = moments.range()
+    columns = {}
+    for i, col in enumerate(measured):
+        center = [moments.mean[i], low[i], *quartiles[i], high[i]]
+        if col in dates:
+            stamps = [pd.Timestamp(round(value * 1e9)) if math.isfinite(value) else pd.NaT for value in center]
+            columns[col] = pd.Series([int(moments.n[i]), *stamps],
+                                     index=['count', 'mean', 'min', *_QUANTILE_NAMES, 'max'], dtype=object)
+        else:
+            columns[col] = pd.Series([moments.n[i], center[0], std[i], *center[1:]],
+                                     index=['count', 'mean', 'std', 'min', *_QUANTILE_NAMES, 'max'])
+    # Mismo orden de filas y columnas que `DataFrame.describe`
+    ordered = [columns[col] for col in first.columns if col in columns]
+    rows = list(dict.fromkeys(name for series in ordered for name in series.index))
+    stats = pd.concat([series.reindex(rows) for series in ordered], axis=1, sort=False)
+    stats.columns = [col for col in first.columns if col in columns]
+    return DatasetSummary(
+        n_rows, first.dtypes, first.head(HEAD_ROWS), stats,
+        {col: _total_id_counts(counts[col]) if col == ID_COLUMN
+         else _total_counts(counts[col], isinstance(first[col].dtype, pd.CategoricalDtype)) for col in text})
@@ -0,0 +1,116 @@
+"""Caché de figuras direccionada por contenido.
+
+Dibujar y guardar un PNG a 300 dpi es lo más caro de graficas.py, y casi
+siempre se vuelve a dibujar lo mismo. Cada figura se identifica por una
+clave (`key`) que resume exactamente lo que se dibuja: las tablas y columnas
+que entran al gráfico (hasheadas por contenido con
+`pd.util.hash_pandas_object`), los parámetros ya resueltos (modo, período,
+método) y el estilo. Si ya hay un PNG con esa clave, `restore` lo copia al
+destino sin importar matplotlib; si no, la figura se dibuja y `store` la
+guarda.
+
+Las variantes de cada figura van a `<caché>/figuras/<figura>/<clave>.png`
+junto a la caché columnar del dataset. Se conservan las MAX_VARIANTS usadas
+más recientemente (CAMPANAS_FIGURAS_VARIANTES); cada acierto renueva la
+fecha del archivo y las más viejas se borran al guardar una nueva. Con
+CAMPANAS_CACHE=0 no se lee ni se escribe nada.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+
+from campaign_analytics import ingest, profiling
+from campaign_analytics.cache import CACHE_DIR, CACHE_ENABLED
+
+FIGURE_DIR = 'figuras'
+MAX_VARIANTS = int(os.environ.get('CAMPANAS_FIGURAS_VARIANTES', '8'))
+# La salida de un mismo gráfico cambia entre versiones de estas bibliotecas
+LIBRARIES = ['matplotlib', 'seaborn']
+
+
+@functools.cache
+def _library_versions():
+    from importlib import metadata
+
+    versions = {}
+    for name in LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:  # pragma: no cover - depende del entorno
+            versions[name] = None
+    return versions
+
+
+def _update(digest, value):
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        header = [list(map(str, frame.columns)), list(map(str, frame.dtypes)), list(frame.index.names), len(frame)]
+        digest.update(json.dumps(header, default=str).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+def key(*parts):
+    """Clave de una figura: hash de `parts` (DataFrames, Series o valores JSON)."""
+    with profiling.stage('figcache.clave'):
+        digest = hashlib.blake2b(digest_size=16)
+        _update(digest, _library_versions())
+        for part in parts:
+            _update(digest, part)
+        return digest.hexdigest()
+
+
+def folder(data_path, name):
+    """Carpeta de las variantes de la figura `name` del dataset `data_path`."""
+    return os.path.join(ingest.source_folder(data_path), CACHE_DIR, FIGURE_DIR, name)
+
+
+def restore(data_path, name, figure_key, path):
+    """Copia a `path` la variante `figure_key` si existe; devuelve True si la encontró."""
+    if not CACHE_ENABLED:
+        return False
+    cached = os.path.join(folder(data_path, name), figure_key + '.png')
+    try:
+        with profiling.stage('figcache.restaurar'):
+            shutil.copyfile(cached, path)
+    except FileNotFoundError:
+        return False
+    # Uso reciente: la última en ser desalojada
+    os.utime(cached)
+    return True
+
+
+def store(data_path, name, figure_key, path):
+    """Guarda el PNG recién dibujado en `path` como la variante `figure_key`."""
+    if not CACHE_ENABLED:
+        return
+    target = folder(data_path, name)
+    os.makedirs(target, exist_ok=True)
+    cached = os.path.join(target, figure_key + '.png')
+    tmp = f'{cached}.{os.getpid()}.tmp'
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, cached)
+    evict(target)
+
+
+def evict(target, keep=MAX_VARIANTS):
+    """Deja en `target` solo las `keep` variantes usadas más recientemente."""
+    variants = []
+    for entry in os.scandir(target):
+        if entry.name.endswith('.png'):
+            try:
+                variants.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:  # la borró otro proceso
+                continue
+    variants.sort(reverse=True)
+    for _, old in variants[keep:]:
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            pass
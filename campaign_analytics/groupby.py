@@ -0,0 +1,261 @@
+"""Frecuencias y agregados por grupo sobre códigos enteros.
+
+El loader ya entrega plataforma, tipo_campana y audiencia_objetivo como
+categóricas, es decir, codificadas como diccionario: un array de códigos
+enteros y la lista de valores. Aquí se cuenta y se suma directamente sobre
+esos códigos con `np.bincount`, sin hashear ni comparar strings:
+
+- `value_counts` reemplaza a `Series.value_counts` (para columnas object se
+  codifican una vez con `pd.factorize`);
+- `GroupCube` acumula conteos y sumas para todas las combinaciones de
+  varias claves a la vez (plataforma x tipo x audiencia) en un array denso;
+  cualquier agrupación por un subconjunto de esas claves sale sumando ejes
+  del cubo, sin volver a recorrer las filas. Se actualiza por bloques y se
+  combina entre particiones; `where` recorta el cubo a ciertos valores de
+  cada clave.
+
+El cubo es denso: pensado para claves de pocos valores, no para campana_id.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def encode(values):
+    """(códigos, valores) de una Series; los faltantes tienen código -1."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(dtype='int64'), values.cat.categories
+    codes, levels = pd.factorize(values, sort=False)
+    return codes.astype('int64', copy=False), pd.Index(levels)
+
+
+def value_counts(values):
+    """Igual que `values.value_counts()` (incluye las categorías sin filas)."""
+    codes, levels = encode(values)
+    counts = np.bincount(codes[codes >= 0], minlength=len(levels))
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        index = pd.CategoricalIndex(levels, categories=levels, ordered=values.cat.ordered, name=values.name)
+    else:
+        index = pd.Index(levels, name=values.name)
+    return pd.Series(counts, index=index, name='count').sort_values(ascending=False, kind='stable')
+
+
+class GroupCube:
+    """Conteos y sumas por cada combinación de `keys`, bloque a bloque.
+
+    `counts` y `sums[col]` son arrays con un eje por clave (un lugar por
+    valor de la clave, en el orden de `levels`). `nonnull[col]` cuenta los
+    valores no faltantes, para los promedios. Las filas con alguna clave
+    faltante se descartan, como en `groupby`.
+    """
+
+    def __init__(self, keys, columns=()):
+        self.keys = [keys] if isinstance(keys, str) else list(keys)
+        self.columns = list(columns)
+        self.levels = [pd.Index([]) for _ in self.keys]
+        self.dtypes = {}
+        self.counts = np.zeros((0,) * len(self.keys), dtype='int64')
+        self.sums = {col: np.zeros(self.counts.shape) for col in self.columns}
+        self.nonnull = {col: np.zeros(self.counts.shape, dtype='int64') for col in self.columns}
+
+    @classmethod
+    def from_chunks(cls, chunks, keys, columns=()):
+        cube = cls(keys, columns)
+        for chunk in chunks:
+            cube.update(chunk)
+        return cube
+
+    @property
+    def shape(self):
+        return tuple(len(levels) for levels in self.levels)
+
+    def _map_levels(self, axis, levels):
+        """Posición en el cubo de cada valor de `levels`, agregando los nuevos."""
+        if len(self.levels[axis]) == 0:
+            # Se adopta el tipo de los valores (fechas, categorías, texto)
+            self.levels[axis] = pd.Index(levels).copy()
+            return np.arange(len(levels))
+        positions = self.levels[axis].get_indexer(levels)
+        new = positions < 0
+        if new.any():
+            start = len(self.levels[axis])
+            self.levels[axis] = self.levels[axis].append(pd.Index(levels[new]))
+            positions[new] = np.arange(start, start + new.sum())
+        return positions
+
+    def _grow(self, shape):
+        if shape == self.counts.shape:
+            return
+        pad = [(0, new - old) for old, new in zip(self.counts.shape, shape)]
+        self.counts = np.pad(self.counts, pad)
+        for col in self.columns:
+            self.sums[col] = np.pad(self.sums[col], pad)
+            self.nonnull[col] = np.pad(self.nonnull[col], pad)
+
+    def update(self, chunk):
+        """Incorpora un bloque (DataFrame con las claves y las columnas)."""
+        if len(chunk) == 0:
+            return self
+        codes = []
+        for axis, key in enumerate(self.keys):
+            key_codes, levels = encode(chunk[key])
+            positions = self._map_levels(axis, levels)
+            codes.append(np.where(key_codes >= 0, positions[key_codes], -1))
+        self._grow(self.shape)
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        if not valid.all():
+            codes = [c[valid] for c in codes]
+        flat = np.ravel_multi_index(codes, self.shape)
+        size = math.prod(self.shape)
+        counts = np.bincount(flat, minlength=size).reshape(self.shape)
+        self.counts += counts
+        for col in self.columns:
+            self.dtypes.setdefault(col, chunk[col].dtype)
+            values = chunk[col].to_numpy(dtype='float64', na_value=np.nan)
+            if not valid.all():
+                values = values[valid]
+            present = ~np.isnan(values)
+            if present.all():
+                self.sums[col] += np.bincount(flat, weights=values, minlength=size).reshape(self.shape)
+                self.nonnull[col] += counts
+            else:
+                self.sums[col] += np.bincount(flat[present], weights=values[present],
+                                              minlength=size).reshape(self.shape)
+                self.nonnull[col] += np.bincount(flat[present], minlength=size).reshape(self.shape)
+        return self
+
+    def merge(self, other):
+        """Combina el cubo de otra partición (mismas claves y columnas) en este."""
+        if other.keys != self.keys or other.columns != self.columns:
+            raise ValueError(f"Cubos incompatibles: {self.keys}/{self.columns} vs {other.keys}/{other.columns}")
+        positions = [self._map_levels(axis, levels) for axis, levels in enumerate(other.levels)]
+        self._grow(self.shape)
+        target = np.ix_(*positions)
+        self.counts[target] += other.counts
+        for col in self.columns:
+            self.dtypes.setdefault(col, other.dtypes.get(col))
+            self.sums[col][target] += other.sums[col]
+            self.nonnull[col][target] += other.nonnull[col]
+        return self
+
+    def where(self, **conditions):
+        """Cubo restringido a los valores de clave que cumplen `conditions`.
+
+        Cada condición es un valor, una lista de valores o una función que
+        recibe los valores de la clave (Index) y devuelve una máscara:
+
+            cube.where(plataforma=['TikTok Ads'], fecha_campana=lambda d: d >= '2025-06-01')
+        """
+        selection = []
+        for axis, key in enumerate(self.keys):
+            levels = self.levels[axis]
+            condition = conditions.pop(key, None)
+            if condition is None:
+                mask = np.ones(len(levels), dtype=bool)
+            elif callable(condition):
+                mask = np.asarray(condition(levels), dtype=bool)
+            elif pd.api.types.is_list_like(condition):
+                mask = levels.isin(condition)
+            else:
+                mask = levels == condition
+            selection.append(np.flatnonzero(mask))
+        if conditions:
+            raise KeyError(f"Claves que no están en el cubo: {sorted(conditions)}")
+        cube = GroupCube(self.keys, self.columns)
+        target = np.ix_(*selection)
+        cube.levels = [levels[positions] for levels, positions in zip(self.levels, selection)]
+        cube.dtypes = dict(self.dtypes)
+        cube.counts = self.counts[target]
+        cube.sums = {col: values[target] for col, values in self.sums.items()}
+        cube.nonnull = {col: values[target] for col, values in self.nonnull.items()}
+        return cube
+
+    def __getstate__(self):
+        # En disco solo las celdas con filas, y los no faltantes solo si difieren del conteo
+        cells = np.flatnonzero(self.counts)
+        state = dict(self.__dict__)
+        state.update({
+            'shape': self.shape,
+            'cells': cells.astype('int32' if self.counts.size < 2 ** 31 else 'int64'),
+            'counts': self.counts.ravel()[cells],
+            'sums': {col: values.ravel()[cells] for col, values in self.sums.items()},
+            'nonnull': {col: None if np.array_equal(values, self.counts) else values.ravel()[cells]
+                        for col, values in self.nonnull.items()},
+        })
+        return state
+
+    def __setstate__(self, state):
+        shape, cells = state.pop('shape'), state.pop('cells')
+
+        def dense(values, dtype):
+            array = np.zeros(math.prod(shape), dtype=dtype)
+            array[cells] = values
+            return array.reshape(shape)
+        counts = dense(state['counts'], 'int64')
+        state['counts'] = counts
+        state['sums'] = {col: dense(values, 'float64') for col, values in state['sums'].items()}
+        state['nonnull'] = {col: counts.copy() if values is None else dense(values, 'int64')
+                            for col, values in state['nonnull'].items()}
+        self.__dict__.update(state)
+
+    def _reduce(self, by):
+        by = self.keys if by is None else [by] if isinstance(by, str) else list(by)
+        axes = tuple(i for i, key in enumerate(self.keys) if key not in by)
+        order = [self.keys.index(key) for key in by]
+
+        def reduce(array):
+            # Ejes de `by` en el orden pedido, el resto sumado
+            kept = [i for i in range(array.ndim) if i not in axes]
+            return np.transpose(array.sum(axis=axes), [kept.index(i) for i in order])
+        return by, order, reduce
+
+    def _frame(self, by, order, counts, data):
+        observed = np.nonzero(counts > 0)
+        if len(by) == 1:
+            index = pd.Index(self.levels[order[0]][observed[0]], name=by[0])
+        else:
+            index = pd.MultiIndex.from_arrays(
+                [self.levels[axis][positions] for axis, positions in zip(order, observed)], names=by)
+        return pd.DataFrame({col: values[observed] for col, values in data.items()}, index=index).sort_index()
+
+    def _columns(self, columns):
+        return self.columns if columns is None else [columns] if isinstance(columns, str) else list(columns)
+
+    def size(self, by=None):
+        """Filas por grupo (como `groupby(by, observed=True).size()`)."""
+        by, order, reduce = self._reduce(by)
+        counts = reduce(self.counts)
+        return self._frame(by, order, counts, {'size': counts})['size']
+
+    def sum(self, by=None, columns=None):
+        """Sumas por grupo; los enteros se devuelven como int64."""
+        by, order, reduce = self._reduce(by)
+        data = {}
+        for col in self._columns(columns):
+            values = reduce(self.sums[col])
+            integer = np.issubdtype(self.dtypes.get(col, np.dtype('float64')), np.integer)
+            data[col] = values.round().astype('int64') if integer else values
+        return self._frame(by, order, reduce(self.counts), data)
+
+    def mean(self, by=None, columns=None):
+        """Promedios por grupo (ignoran faltantes, conservan el tipo float de la columna)."""
+        by, order, reduce = self._reduce(by)
+        data = {}
+        for col in self._columns(columns):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = reduce(self.sums[col]) / reduce(self.nonnull[col])
+            dtype = self.dtypes.get(col, np.dtype('float64'))
+            data[col] = values.astype(dtype) if np.issubdtype(dtype, np.floating) else values
+        return self._frame(by, order, reduce(self.counts), data)
+
+
+def group_sum(df, by, columns):
+    """`df.groupby(by, observed=True)[columns].sum()` sobre códigos enteros."""
+    return GroupCube(by, columns).update(df).sum()
+
+
+def group_mean(df, by, columns):
+    """`df.groupby(by, observed=True)[columns].mean()` sobre códigos enteros."""
+    return GroupCube(by, columns).update(df).mean()
@@ -0,0 +1,222 @@
+"""Estado agregado persistente para refrescar el informe solo con filas nuevas.
+
+El CSV de campañas crece por el final (se agregan filas cada día). En vez de
+recalcular toda la historia, `refresh` guarda junto a la caché un estado con
+lo que el informe necesita:
+
+- los KPIs globales (KPIAccumulator, combinable);
+- las sumas por plataforma, por tipo de campaña y por día (para la tendencia);
+- las campañas de mayor y menor ROAS para la tabla resumen;
+- la marca de agua (última fecha_campana vista).
+
+También guarda la posición en bytes hasta la que se leyó el archivo y un
+hash de todos los bytes anteriores a esa posición. En la siguiente ejecución
+solo se parsea lo agregado después de esa posición, así que el parseo
+depende del tamaño del delta y no de la historia; la historia solo se
+vuelve a hashear (a velocidad de disco, sin parsear) para confirmar que no
+cambió, y el hash se extiende con los bytes nuevos. Si el archivo se
+reescribió (es más corto o cambió cualquier byte anterior a la posición), o
+cambió el esquema, el estado se reconstruye desde cero.
+
+El CSV no viene ordenado por fecha, así que la marca de agua no decide qué
+filas son nuevas: eso lo decide la posición. Las filas agregadas con fecha
+anterior a la marca se incorporan igual y se cuentan como tardías.
+"""
+
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+from campaign_analytics.cache import CACHE_DIR, SCHEMA_VERSION
+from campaign_analytics import ingest, timeseries
+from campaign_analytics.groupby import GroupCube, group_sum
+from campaign_analytics.kpis import KPIAccumulator
+from campaign_analytics.loader import DATE_COLUMN, iter_chunks, read_csv_range
+from campaign_analytics.selection import TopK
+
+PLATFORM_COLUMNS = ['revenue_generado', 'costo_total', 'conversiones']
+CAMPAIGN_TYPE_COLUMNS = ['conversiones', 'revenue_generado', 'costo_total']
+SUMMARY_COLUMNS = ['campana_id', 'plataforma', 'tipo_campana', 'impresiones', 'conversiones',
+                   'costo_total', 'revenue_generado', 'roas', 'cpa']
+# Súbase al cambiar lo que guarda IncrementalState: el estado viejo se reconstruye
+STATE_VERSION = 4
+# Campañas de cada extremo que se conservan para la tabla resumen
+EXTREME_CAMPAIGNS = 50
+# Bloques con que se busca hacia atrás el último salto de línea y se hashea el archivo
+_TAIL_BYTES = 1 << 16
+_HASH_BLOCK = 1 << 20
+
+
+def _add_sums(current, chunk, by, columns):
+    sums = group_sum(chunk, by, columns)
+    sums.index = sums.index.astype(str)
+    total = sums if current is None else current.add(sums, fill_value=0).sort_index()
+    total['conversiones'] = total['conversiones'].astype('int64')
+    return total
+
+
+def _new_digest():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _extend(digest, path, start, stop):
+    """Agrega a `digest` los bytes [start, stop) de `path` y lo devuelve."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            block = f.read(min(_HASH_BLOCK, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def _header_end(path):
+    """Posición tras la línea de encabezado."""
+    with open(path, 'rb') as f:
+        f.readline()
+        return f.tell()
+
+
+def _complete_lines_end(path, size):
+    """Posición tras el último salto de línea (ignora una última fila a medio escribir)."""
+    with open(path, 'rb') as f:
+        pos = size
+        while pos > 0:
+            start = max(0, pos - _TAIL_BYTES)
+            f.seek(start)
+            block = f.read(pos - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            pos = start
+    return 0
+
+
+class IncrementalState:
+    """Agregados del informe y posición de lectura de un archivo."""
+
+    def __init__(self, extremes=EXTREME_CAMPAIGNS):
+        self.schema = SCHEMA_VERSION
+        self.version = STATE_VERSION
+        self.extremes = extremes
+        self.kpis = KPIAccumulator()
+        self.platforms = None
+        self.campaign_types = None
+        self.daily = GroupCube(DATE_COLUMN, timeseries.COLUMNS)
+        self.top = TopK('roas', extremes, largest=True, columns=SUMMARY_COLUMNS)
+        self.bottom = TopK('roas', extremes, largest=False, columns=SUMMARY_COLUMNS)
+        self.watermark = None
+        self.offset = 0
+        self.prefix = None
+        self.last_delta = 0
+        self.late_rows = 0
+
+    def update(self, chunk):
+        """Incorpora un bloque de filas nuevas."""
+        if len(chunk) == 0:
+            return self
+        if self.watermark is not None:
+            # Tardías: estrictamente anteriores (lo del mismo día es el caso normal)
+            self.late_rows += int((chunk[DATE_COLUMN] < self.watermark).sum())
+        self.kpis.update(chunk)
+        self.platforms = _add_sums(self.platforms, chunk, 'plataforma', PLATFORM_COLUMNS)
+        self.campaign_types = _add_sums(self.campaign_types, chunk, 'tipo_campana', CAMPAIGN_TYPE_COLUMNS)
+        self.daily.update(chunk)
+        # TopK indexa por posición global de fila: así no se mezclan campañas de bloques distintos
+        summary = chunk[SUMMARY_COLUMNS].astype({'plataforma': str, 'tipo_campana': str})
+        self.top.update(summary)
+        self.bottom.update(summary)
+        newest = chunk[DATE_COLUMN].max()
+        if self.watermark is None or newest > self.watermark:
+            self.watermark = newest
+        self.last_delta += len(chunk)
+        return self
+
+    def platform_summary(self):
+        summary = self.platforms.copy()
+        summary['ROAS'] = summary['revenue_generado'] / summary['costo_total']
+        return summary
+
+    def campaign_type_summary(self):
+        summary = self.campaign_types.copy()
+        summary['ROAS'] = summary['revenue_generado'] / summary['costo_total']
+        return summary
+
+    def daily_summary(self):
+        return timeseries.daily(self.daily)
+
+    def extreme_campaigns(self):
+        """Mejores y peores campañas por ROAS, ordenadas de mayor a menor y sin repetir."""
+        top, bottom = self.top.result(), self.bottom.result()
+        # bottom viene de menor a mayor: invertido queda a continuación de top
+        return pd.concat([top, bottom.drop(top.index, errors='ignore').iloc[::-1]])
+
+
+def state_path(source):
+    folder = os.path.join(os.path.dirname(os.path.abspath(source)), CACHE_DIR)
+    return os.path.join(folder, os.path.basename(source) + '.incremental.pkl')
+
+
+def load_state(source):
+    try:
+        with open(state_path(source), 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    current = (getattr(state, 'schema', None), getattr(state, 'version', None)) == (SCHEMA_VERSION, STATE_VERSION)
+    return state if current else None
+
+
+def save_state(source, state):
+    path = state_path(source)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def refresh(source, chunksize=None, extremes=EXTREME_CAMPAIGNS):
+    """Actualiza (o crea) el estado de `source` con las filas agregadas desde la última vez.
+
+    Devuelve el estado; `state.last_delta` es el número de filas incorporadas
+    en esta llamada (todas, si el estado se reconstruyó).
+    """
+    if ingest.is_multi(source):
+        raise ValueError(f"El modo incremental sigue un único archivo que crece; {source!r} es un "
+                         f"directorio o un glob (use el informe completo, que ya reutiliza la caché de cada archivo)")
+    size = os.path.getsize(source)
+    end = _complete_lines_end(source, size)
+    state = load_state(source)
+    digest = _new_digest()
+    # Lo ya incorporado sigue valiendo si el hash de [0, offset) no cambió
+    if state is not None and state.extremes == extremes and state.offset <= size \
+            and _extend(digest, source, 0, state.offset).hexdigest() == state.prefix:
+        start = state.offset
+        state.last_delta = state.late_rows = 0
+        if end > state.offset:
+            for chunk in read_csv_range(source, state.offset, end, chunksize):
+                state.update(chunk)
+    else:
+        # Primera vez o archivo reescrito: se recorre entero una sola vez. Si termina
+        # en una fila a medio escribir se lee solo hasta la última línea completa
+        # (esa fila entra en la próxima ejecución); si no, vale la caché columnar.
+        state = IncrementalState(extremes)
+        digest, start = _new_digest(), 0
+        if end == size:
+            chunks = iter_chunks(source, chunksize)
+        else:
+            chunks = read_csv_range(source, _header_end(source), end, chunksize)
+        for chunk in chunks:
+            state.update(chunk)
+        state.late_rows = 0
+    if end != state.offset or state.prefix is None:
+        state.offset = end
+        state.prefix = _extend(digest, source, start, end).hexdigest()
+        save_state(source, state)
+    return state
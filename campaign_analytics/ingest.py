@@ -0,0 +1,179 @@
+"""Ingesta de varios archivos de campañas (un CSV por día y plataforma).
+
+En producción los datos llegan como muchos CSV chicos con el formato de
+datos_sinteticos.csv. En todas partes donde el paquete acepta la ruta del
+dataset (`open_dataset`, `iter_chunks`, `load_campaigns`, `--datos` del
+pipeline, CAMPANAS_DATOS) se puede dar también un directorio (se leen sus
+*.csv) o un glob (`exports/2025-06-*.csv`). Los archivos se recorren en orden
+alfabético, que para exportaciones con fecha en el nombre es el cronológico.
+
+El parseo se reparte entre procesos (CAMPANAS_INGESTA_PROCESOS, por defecto
+uno por núcleo):
+
+- con pyarrow, cada proceso convierte su archivo a la caché columnar
+  (campaign_analytics.cache) y devuelve solo sus estadísticas; después los
+  bloques se leen en orden desde esas cachés con memory-map, sin volver a
+  parsear ni pasar DataFrames entre procesos;
+- sin pyarrow, cada proceso devuelve el DataFrame tipado de su archivo y se
+  entregan en orden, con un número acotado de archivos en vuelo.
+
+Cada pasada registra por archivo filas, bytes y segundos (`FileStats`);
+`throughput` los resume en filas/s y MB/s.
+"""
+
+import collections
+import glob
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from campaign_analytics import cache, profiling
+from campaign_analytics.loader import DEFAULT_CHUNKSIZE, load_campaigns
+
+PATTERN = '*.csv'
+WORKERS = int(os.environ.get('CAMPANAS_INGESTA_PROCESOS', '0')) or os.cpu_count() or 1
+
+FileStats = collections.namedtuple('FileStats', 'path rows bytes seconds cached')
+# Última ingesta de cada fuente (por ruta absoluta): (FileStats por archivo, segundos totales)
+LAST_STATS = {}
+
+
+def is_multi(path):
+    """True si `path` es un directorio o un glob (y no un archivo)."""
+    return os.path.isdir(path) or glob.has_magic(path)
+
+
+def sources(path):
+    """Archivos que forman la fuente `path`, en orden alfabético."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, PATTERN)))
+    if glob.has_magic(path):
+        return sorted(file for file in glob.glob(path) if os.path.isfile(file))
+    return [path]
+
+
+def source_name(path):
+    """Nombre para los archivos de estado de `path` (sin caracteres de glob)."""
+    name = os.path.basename(os.path.normpath(path))
+    return re.sub(r'[^\w.-]', '_', name) if glob.has_magic(name) else name
+
+
+def source_folder(path):
+    """Carpeta junto a la que van la caché y los estados de `path`."""
+    if glob.has_magic(path):
+        path = path[:re.search(r'[*?[]', path).start()]
+        return os.path.abspath(os.path.dirname(path) or '.')
+    return os.path.dirname(os.path.abspath(os.path.normpath(path)))
+
+
+def _ingest_file(path, chunksize, columns, use_cache):
+    """Trabajo de cada proceso: deja lista la caché del archivo o lo parsea."""
+    start = time.perf_counter()
+    if use_cache:
+        cached = cache.is_valid(path)
+        rows = cache.ensure(path, chunksize)
+        frame = None
+    else:
+        cached = False
+        frame = load_campaigns(path, chunksize, columns, use_cache=False, derive=False)
+        rows = len(frame)
+    stats = FileStats(path, rows, os.path.getsize(path), time.perf_counter() - start, cached)
+    return stats, frame
+
+
+def _pool(workers):
+    # Los procesos no heredan los hilos de quien llama (el pipeline corre en hilos)
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def _ingest(files, chunksize, columns, use_cache, workers):
+    """Resultados de `_ingest_file` en el orden de `files`, con `workers` procesos."""
+    workers = max(1, min(workers, len(files)))
+    if workers == 1:
+        for path in files:
+            yield _ingest_file(path, chunksize, columns, use_cache)
+        return
+    with _pool(workers) as pool:
+        pending = collections.deque()
+        queue = iter(files)
+        # Pocos archivos en vuelo: sin caché cada resultado es un DataFrame entero
+        for path in queue:
+            pending.append(pool.submit(_ingest_file, path, chunksize, columns, use_cache))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            yield pending.popleft().result()
+            path = next(queue, None)
+            if path is not None:
+                pending.append(pool.submit(_ingest_file, path, chunksize, columns, use_cache))
+
+
+def prepare(path, chunksize=None, workers=WORKERS):
+    """Construye en paralelo las cachés de todos los archivos de `path`.
+
+    Devuelve la lista de `FileStats` (también queda en LAST_STATS).
+    """
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    files = sources(path)
+    start = time.perf_counter()
+    with profiling.stage('ingesta') as registro:
+        # Solo van al pool los archivos nuevos o cambiados; el resto ya tiene caché
+        todo = [file for file in files if not cache.is_valid(file)]
+        built = {stats.path: stats for stats, _ in _ingest(todo, chunksize, None, True, workers)}
+        stats = [built[file] if file in built else _ingest_file(file, chunksize, None, True)[0] for file in files]
+        registro['filas'] = sum(s.rows for s in stats)
+    LAST_STATS[os.path.abspath(path)] = (stats, time.perf_counter() - start)
+    return stats
+
+
+def iter_chunks(path, chunksize=None, columns=None, use_cache=True, workers=WORKERS):
+    """Bloques tipados de todos los archivos de `path`, en orden de archivo."""
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    if use_cache and cache.available():
+        prepare(path, chunksize, workers)
+        for file in sources(path):
+            yield from cache.read_cached(file, chunksize, columns)
+        return
+    start, stats = time.perf_counter(), []
+    for file_stats, frame in _ingest(sources(path), chunksize, columns, False, workers):
+        stats.append(file_stats)
+        for offset in range(0, len(frame), chunksize):
+            yield frame.iloc[offset:offset + chunksize]
+    LAST_STATS[os.path.abspath(path)] = (stats, time.perf_counter() - start)
+
+
+def throughput(stats, seconds=None):
+    """Tabla por archivo: filas, MB, segundos, filas/s y MB/s, más una fila TOTAL.
+
+    `seconds` es el tiempo real de toda la ingesta; con varios procesos es
+    menor que la suma de los tiempos por archivo.
+    """
+    import pandas as pd
+
+    table = pd.DataFrame([{
+        'archivo': os.path.basename(s.path),
+        'filas': s.rows,
+        'MB': s.bytes / 1e6,
+        'segundos': s.seconds,
+        'en_cache': s.cached,
+    } for s in stats]).set_index('archivo')
+    total_seconds = table['segundos'].sum() if seconds is None else seconds
+    table.loc['TOTAL'] = [table['filas'].sum(), table['MB'].sum(), total_seconds, table['en_cache'].all()]
+    table['filas_por_s'] = table['filas'] / table['segundos']
+    table['MB_por_s'] = table['MB'] / table['segundos']
+    return table
+
+
+def print_throughput(path, file=sys.stderr):
+    """Imprime el rendimiento de la última ingesta de `path` (los archivos que se parsearon)."""
+    stats, seconds = LAST_STATS.get(os.path.abspath(path), ([], 0.0))
+    parsed = [s for s in stats if not s.cached]
+    if not parsed:
+        print(f"Ingesta: {len(stats)} archivos, todos ya en caché", file=file)
+        return
+    print(f"Ingesta: {len(parsed)} de {len(stats)} archivos parseados en {seconds:.2f} s", file=file)
+    print(throughput(parsed, seconds).round(2).to_string(), file=file)
@@ -0,0 +1,196 @@
+"""Acumulador de KPIs en una sola pasada, combinable entre bloques.
+
+Reemplaza las reducciones sueltas (`df[col].sum()`, `df[col].mean()`,
+`df.loc[df[col].idxmax()]`) de los informes. Cada bloque se procesa con
+`update` y los acumuladores de particiones distintas se combinan con `merge`,
+así que el encabezado del informe puede salir de un stream o de varios
+procesos en paralelo.
+"""
+
+import math
+
+# Columnas que se suman tal cual (conteos como int de Python para no
+# desbordar int32 al sumar millones de filas)
+SUM_COLUMNS = {
+    'revenue_generado': float,
+    'costo_total': float,
+    'conversiones': int,
+    'impresiones': int,
+    'clicks': int,
+}
+# Columnas de las que se reporta el promedio por campaña y el rango
+MEAN_COLUMNS = ('roas', 'ctr', 'cpa')
+RANGE_COLUMNS = ('roas', 'ctr', 'cpa', 'fecha_campana')
+# Campañas destacadas: nombre -> (columna, 'max' | 'min')
+EXTREME_ROWS = {
+    'best_roas_campaign': ('roas', 'max'),
+    'worst_roas_campaign': ('roas', 'min'),
+    'best_conversion_campaign': ('conversiones', 'max'),
+}
+# Columnas de las campañas destacadas que usa el informe, además de las anteriores
+ROW_COLUMNS = ('campana_id', 'plataforma', 'tipo_campana')
+# Todo lo que lee `update`: el núcleo carga solo esto para la tabla de KPIs
+COLUMNS = list(dict.fromkeys([*SUM_COLUMNS, *MEAN_COLUMNS, *RANGE_COLUMNS, *ROW_COLUMNS]))
+
+
+class KPIAccumulator:
+    """KPIs globales del informe calculados bloque a bloque.
+
+    Las filas destacadas se guardan como la Series completa de la campaña,
+    igual que `df.loc[idx]`. En empates gana la primera fila vista, como en
+    `idxmax`/`idxmin`, siempre que los bloques se combinen en orden.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.sums = {col: kind() for col, kind in SUM_COLUMNS.items()}
+        self.counts = {col: 0 for col in MEAN_COLUMNS}
+        self.mean_sums = {col: 0.0 for col in MEAN_COLUMNS}
+        self.mins = {col: None for col in RANGE_COLUMNS}
+        self.maxs = {col: None for col in RANGE_COLUMNS}
+        self.rows = {name: None for name in EXTREME_ROWS}
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        acc = cls()
+        for chunk in chunks:
+            acc.update(chunk)
+        return acc
+
+    def update(self, chunk):
+        """Incorpora un bloque (DataFrame) al acumulado."""
+        if len(chunk) == 0:
+            return self
+        self.n_rows += len(chunk)
+        for col, kind in SUM_COLUMNS.items():
+            self.sums[col] += kind(chunk[col].sum())
+        for col in MEAN_COLUMNS:
+            self.counts[col] += int(chunk[col].count())
+            self.mean_sums[col] += float(chunk[col].astype('float64').sum())
+        for col in RANGE_COLUMNS:
+            values = chunk[col]
+            if values.count():
+                self._update_range(col, values.min(), values.max())
+        for name, (col, how) in EXTREME_ROWS.items():
+            values = chunk[col]
+            if values.count():
+                idx = values.idxmax() if how == 'max' else values.idxmin()
+                self._update_row(name, chunk.loc[idx])
+        return self
+
+    def merge(self, other):
+        """Combina otro acumulador (de una partición posterior) en este."""
+        self.n_rows += other.n_rows
+        for col in SUM_COLUMNS:
+            self.sums[col] += other.sums[col]
+        for col in MEAN_COLUMNS:
+            self.counts[col] += other.counts[col]
+            self.mean_sums[col] += other.mean_sums[col]
+        for col in RANGE_COLUMNS:
+            if other.mins[col] is not None:
+                self._update_range(col, other.mins[col], other.maxs[col])
+        for name, row in other.rows.items():
+            if row is not None:
+                self._update_row(name, row)
+        return self
+
+    def _update_range(self, col, low, high):
+        if self.mins[col] is None or low < self.mins[col]:
+            self.mins[col] = low
+        if self.maxs[col] is None or high > self.maxs[col]:
+            self.maxs[col] = high
+
+    def _update_row(self, name, row):
+        col, how = EXTREME_ROWS[name]
+        current = self.rows[name]
+        if current is None:
+            self.rows[name] = row
+        elif how == 'max' and row[col] > current[col]:
+            self.rows[name] = row
+        elif how == 'min' and row[col] < current[col]:
+            self.rows[name] = row
+
+    def _mean(self, col):
+        return self.mean_sums[col] / self.counts[col] if self.counts[col] else math.nan
+
+    def minimum(self, col):
+        return self.mins[col]
+
+    def maximum(self, col):
+        return self.maxs[col]
+
+    @property
+    def total_revenue(self):
+        return self.sums['revenue_generado']
+
+    @property
+    def total_cost(self):
+        return self.sums['costo_total']
+
+    @property
+    def total_conversions(self):
+        return self.sums['conversiones']
+
+    @property
+    def total_impresiones(self):
+        return self.sums['impresiones']
+
+    @property
+    def total_clicks(self):
+        return self.sums['clicks']
+
+    @property
+    def avg_roas(self):
+        return self._mean('roas')
+
+    @property
+    def avg_ctr(self):
+        return self._mean('ctr')
+
+    @property
+    def avg_cpa(self):
+        return self._mean('cpa')
+
+    # Razones de sumas: el valor del total, que es lo que pesa en el negocio
+    # (el promedio de razones da el mismo peso a una campaña de $10 que a una de $10.000)
+    def _ratio(self, numerator, denominator, scale=1.0):
+        return numerator / denominator * scale if denominator else math.nan
+
+    @property
+    def weighted_roas(self):
+        return self._ratio(self.total_revenue, self.total_cost)
+
+    @property
+    def weighted_ctr(self):
+        return self._ratio(self.total_clicks, self.total_impresiones, 100.0)
+
+    @property
+    def weighted_conversion_rate(self):
+        return self._ratio(self.total_conversions, self.total_clicks, 100.0)
+
+    @property
+    def weighted_cpc(self):
+        return self._ratio(self.total_cost, self.total_clicks)
+
+    @property
+    def weighted_cpa(self):
+        return self._ratio(self.total_cost, self.total_conversions)
+
+    @property
+    def best_roas_campaign(self):
+        return self.rows['best_roas_campaign']
+
+    @property
+    def worst_roas_campaign(self):
+        return self.rows['worst_roas_campaign']
+
+    @property
+    def best_conversion_campaign(self):
+        return self.rows['best_conversion_campaign']
+
+    @property
+    def period_days(self):
+        """Días entre la primera y la última fecha_campana."""
+        if self.mins['fecha_campana'] is None:
+            return 0
+        return (self.maxs['fecha_campana'] - self.mins['fecha_campana']).days
@@ -0,0 +1,197 @@
+"""Carga por bloques (chunks) de archivos con el formato de datos_sinteticos.csv.
+
+Todas las columnas tienen un tipo explícito para que ningún bloque dependa de
+la inferencia de pandas: categorías para las dimensiones, int32 para los
+conteos y float32 para las tasas. Las columnas monetarias se mantienen en
+float64 porque se suman sobre millones de filas.
+
+pandas se importa al leer, no al importar el módulo: las constantes (ruta,
+esquema, tamaño de bloque) quedan disponibles sin ese costo de arranque.
+"""
+
+import io
+import os
+
+from campaign_analytics import profiling
+
+# Archivo por defecto y tamaño de bloque (filas). Se pueden ajustar con las
+# variables de entorno CAMPANAS_DATOS (un archivo, un directorio o un glob,
+# ver campaign_analytics.ingest) y CAMPANAS_CHUNKSIZE sin tocar los scripts.
+DATA_PATH = os.environ.get('CAMPANAS_DATOS', 'datos_sinteticos.csv')
+DEFAULT_CHUNKSIZE = int(os.environ.get('CAMPANAS_CHUNKSIZE', 250_000))
+# Con CAMPANAS_DERIVAR=1 las tasas (ctr, cpa, roas...) no se leen del archivo:
+# se recalculan desde los conteos con campaign_analytics.metrics
+DERIVE_METRICS = os.environ.get('CAMPANAS_DERIVAR', '0') == '1'
+
+DATE_COLUMN = 'fecha_campana'
+DATE_FORMAT = '%Y-%m-%d'
+
+CATEGORY_COLUMNS = ['plataforma', 'tipo_campana', 'audiencia_objetivo']
+COUNT_COLUMNS = ['impresiones', 'clicks', 'conversiones', 'alcance']
+MONEY_COLUMNS = ['presupuesto_diario', 'costo_total', 'revenue_generado']
+RATE_COLUMNS = ['engagement_rate', 'tiempo_conversion_hrs', 'ctr',
+                'conversion_rate', 'cpc', 'cpa', 'roas']
+
+# Esquema de las 19 columnas en el orden del CSV (fecha_campana se parsea
+# aparte con DATE_FORMAT).
+SCHEMA = {
+    'fecha_campana': 'datetime64[ns]',
+    'campana_id': 'object',
+    'plataforma': 'category',
+    'tipo_campana': 'category',
+    'audiencia_objetivo': 'category',
+    'presupuesto_diario': 'float64',
+    'impresiones': 'int32',
+    'clicks': 'int32',
+    'conversiones': 'int32',
+    'costo_total': 'float64',
+    'revenue_generado': 'float64',
+    'alcance': 'int32',
+    'engagement_rate': 'float32',
+    'tiempo_conversion_hrs': 'float32',
+    'ctr': 'float32',
+    'conversion_rate': 'float32',
+    'cpc': 'float32',
+    'cpa': 'float32',
+    'roas': 'float32',
+}
+
+
+def _read_dtypes(columns):
+    """Tipos que se pasan a read_csv (todo menos la fecha)."""
+    return {col: SCHEMA[col] for col in columns if col != DATE_COLUMN}
+
+
+def _parse_chunks(source, chunksize, columns, **options):
+    import pandas as pd
+
+    columns = list(columns) if columns is not None else list(SCHEMA)
+    reader = pd.read_csv(
+        source,
+        usecols=columns,
+        dtype=_read_dtypes(columns),
+        parse_dates=[DATE_COLUMN] if DATE_COLUMN in columns else False,
+        date_format=DATE_FORMAT,
+        chunksize=chunksize or DEFAULT_CHUNKSIZE,
+        **options,
+    )
+    with reader:
+        while True:
+            with profiling.stage('csv.parse') as registro:
+                chunk = next(reader, None)
+                if chunk is None:
+                    break
+                registro['filas'] = len(chunk)
+            if DATE_COLUMN in columns:
+                with profiling.stage('csv.fechas'):
+                    # pandas >= 3 infiere otra resolución; se fija la del esquema
+                    chunk[DATE_COLUMN] = chunk[DATE_COLUMN].astype(SCHEMA[DATE_COLUMN])
+            # usecols no respeta el orden pedido; se reordena como en el CSV
+            yield chunk[[col for col in SCHEMA if col in columns]]
+
+
+def read_csv_chunks(path=DATA_PATH, chunksize=None, columns=None):
+    """Parsea el CSV en bloques tipados de `chunksize` filas (sin caché)."""
+    yield from _parse_chunks(path, chunksize, columns)
+
+
+class _BoundedReader(io.RawIOBase):
+    """Vista de solo lectura de los próximos `size` bytes de un archivo abierto."""
+
+    def __init__(self, raw, size):
+        self.raw = raw
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.remaining <= 0:
+            return 0
+        n = self.raw.readinto(memoryview(buffer)[:self.remaining]) or 0
+        self.remaining -= n
+        return n
+
+
+def read_csv_range(path, start, stop, chunksize=None, columns=None):
+    """Parsea solo las filas entre los bytes `start` y `stop` del CSV.
+
+    Sirve para leer lo que se agregó al final de un archivo sin recorrer lo
+    anterior; `start` y `stop` deben caer en inicios de línea y el rango no
+    lleva encabezado (las columnas son las de SCHEMA, en orden).
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        # Se lee del archivo a medida que el parser pide bytes: el rango no se copia en memoria
+        data = io.BufferedReader(_BoundedReader(f, stop - start))
+        yield from _parse_chunks(data, chunksize, columns, header=None, names=list(SCHEMA))
+
+
+def iter_chunks(path=DATA_PATH, chunksize=None, columns=None, use_cache=True, derive=None):
+    """Recorre el archivo en bloques tipados de `chunksize` filas.
+
+    Solo un bloque vive en memoria a la vez, así que el consumo máximo no
+    depende del tamaño del archivo. `columns` limita las columnas leídas.
+    Con `use_cache` (y pyarrow instalado) los bloques salen de la caché
+    columnar de campaign_analytics.cache, que se crea en la primera lectura.
+    Con `derive` (por defecto DERIVE_METRICS) las tasas pedidas se recalculan
+    desde los conteos en lugar de leerse. `path` puede ser también un
+    directorio o un glob: sus archivos se parsean en paralelo y se recorren
+    en orden (campaign_analytics.ingest).
+    """
+    from campaign_analytics import cache, ingest
+
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    if derive is None:
+        derive = DERIVE_METRICS
+    if derive:
+        return _derived_chunks(path, chunksize, columns, use_cache)
+    if ingest.is_multi(path):
+        return ingest.iter_chunks(path, chunksize, columns, use_cache)
+    if use_cache and cache.available():
+        return cache.iter_chunks(path, chunksize, columns)
+    return read_csv_chunks(path, chunksize, columns)
+
+
+def _derived_chunks(path, chunksize, columns, use_cache):
+    from campaign_analytics import metrics
+
+    wanted = [col for col in SCHEMA if columns is None or col in columns]
+    derived = [col for col in wanted if col in metrics.DERIVED_METRICS]
+    read = set(wanted) - set(derived)
+    for metric in derived:
+        read.update(metrics.DERIVED_METRICS[metric][:2])
+    for chunk in iter_chunks(path, chunksize, read, use_cache=use_cache, derive=False):
+        yield metrics.with_derived(chunk, derived, SCHEMA, wanted) if derived else chunk[wanted]
+
+
+def concat_chunks(chunks):
+    """Une bloques conservando las columnas categóricas.
+
+    Cada bloque trae sus propias categorías, y pd.concat las convertiría a
+    object si difieren; se unifican antes con union_categoricals.
+    """
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in SCHEMA.items()})
+    df = pd.concat(chunks, ignore_index=True)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True)
+    return df
+
+
+def load_campaigns(path=DATA_PATH, chunksize=None, columns=None, use_cache=True, derive=None):
+    """Carga el archivo completo con el esquema tipado.
+
+    Lee por bloques igual que iter_chunks; úsese solo cuando el análisis
+    necesite todas las filas a la vez.
+    """
+    with profiling.stage('carga') as registro:
+        df = concat_chunks(iter_chunks(path, chunksize=chunksize, columns=columns,
+                                       use_cache=use_cache, derive=derive))
+        registro['filas'] = len(df)
+    return df
@@ -0,0 +1,96 @@
+"""Métricas derivadas (ctr, conversion_rate, cpc, cpa, roas) recalculadas desde los conteos.
+
+El CSV trae estas cinco tasas ya calculadas junto a los conteos de los que
+salen. `derive` las recalcula todas en una sola pasada vectorizada (una
+división sobre matrices de numeradores y denominadores) y deja NaN donde el
+denominador es cero. `mismatches` compara las guardadas con las recalculadas
+al redondeo del CSV, para detectar filas inconsistentes.
+
+Con las tasas recalculadas el loader puede omitir esas cinco columnas al
+leer (`iter_chunks(..., derive=True)` o CAMPANAS_DERIVAR=1). Los agregados
+correctos son razones de sumas (KPIAccumulator.weighted_*), no promedios de
+razones.
+
+numpy y pandas se importan dentro de las funciones: el núcleo lee
+DERIVED_METRICS al importarse y no debe cargarlos por eso.
+"""
+
+# métrica -> (numerador, denominador, escala, decimales con que viene en el CSV)
+DERIVED_METRICS = {
+    'ctr': ('clicks', 'impresiones', 100.0, 3),
+    'conversion_rate': ('conversiones', 'clicks', 100.0, 2),
+    'cpc': ('costo_total', 'clicks', 1.0, 2),
+    'cpa': ('costo_total', 'conversiones', 1.0, 2),
+    'roas': ('revenue_generado', 'costo_total', 1.0, 2),
+}
+INPUT_COLUMNS = sorted({col for num, den, _, _ in DERIVED_METRICS.values() for col in (num, den)})
+
+
+def derive(df, metrics=None, decimals=False):
+    """DataFrame con las métricas recalculadas (float64, mismo índice que `df`).
+
+    Con `decimals` se redondean como en el CSV, para que coincidan con las
+    guardadas cuando estas son correctas.
+    """
+    import numpy as np
+    import pandas as pd
+
+    metrics = list(metrics or DERIVED_METRICS)
+    numerators = np.column_stack([df[DERIVED_METRICS[m][0]].to_numpy(dtype='float64') for m in metrics])
+    denominators = np.column_stack([df[DERIVED_METRICS[m][1]].to_numpy(dtype='float64') for m in metrics])
+    scale = np.array([DERIVED_METRICS[m][2] for m in metrics])
+    values = np.divide(numerators, denominators, out=np.full(numerators.shape, np.nan),
+                       where=denominators != 0)
+    values *= scale
+    if decimals:
+        for i, metric in enumerate(metrics):
+            values[:, i] = np.round(values[:, i], DERIVED_METRICS[metric][3])
+    return pd.DataFrame(values, index=df.index, columns=metrics)
+
+
+def mismatches(df, derived=None):
+    """Máscara (filas x métricas) de valores guardados que no coinciden con los recalculados.
+
+    Se admite la diferencia de redondeo del CSV (media unidad del último
+    decimal). Un valor guardado donde el denominador es cero, o uno faltante
+    donde sí se puede calcular, también cuenta como diferencia.
+    """
+    import numpy as np
+    import pandas as pd
+
+    metrics = [m for m in DERIVED_METRICS if m in df.columns]
+    if derived is None:
+        derived = derive(df, metrics)
+    stored = df[metrics].to_numpy(dtype='float64')
+    expected = derived[metrics].to_numpy()
+    tolerance = np.array([0.5 * 10.0 ** -DERIVED_METRICS[m][3] for m in metrics])
+    # Margen extra por la precisión de float32 en las tasas guardadas
+    tolerance = tolerance + np.abs(expected) * 1e-6
+    with np.errstate(invalid='ignore'):
+        differ = np.abs(stored - expected) > tolerance
+    differ |= np.isnan(stored) != np.isnan(expected)
+    return pd.DataFrame(differ, index=df.index, columns=metrics)
+
+
+def mismatch_summary(chunks):
+    """Filas inconsistentes por métrica (conteo y porcentaje) de un iterable de bloques."""
+    import pandas as pd
+
+    counts, n_rows = pd.Series(dtype='int64'), 0
+    for chunk in chunks:
+        counts = counts.add(mismatches(chunk).sum(), fill_value=0).astype('int64')
+        n_rows += len(chunk)
+    return pd.DataFrame({'filas': counts, 'pct': counts / max(n_rows, 1) * 100})
+
+
+def with_derived(chunk, metrics=None, dtypes=None, columns=None):
+    """Agrega a `chunk` las métricas recalculadas (redondeadas como en el CSV).
+
+    `metrics` limita las métricas (por defecto, todas), `dtypes` fija el tipo
+    de cada una (por defecto float64) y `columns` el orden final de las columnas.
+    """
+    derived = derive(chunk, metrics, decimals=True)
+    chunk = chunk.copy()
+    for metric in derived.columns:
+        chunk[metric] = derived[metric].astype((dtypes or {}).get(metric, 'float64'))
+    return chunk[columns] if columns is not None else chunk
@@ -0,0 +1,247 @@
+"""Detección de outliers por rango intercuartílico (IQR), vectorizada.
+
+`iqr_outliers` reemplaza el bucle por columna de leerdatos.py (dos
+`quantile` y un DataFrame filtrado por columna): los cuartiles de todas las
+columnas salen de una sola llamada sobre la matriz NumPy y los outliers se
+cuentan por broadcasting contra los límites, sin copiar filas.
+
+Para datos que no caben en memoria, `StreamingIQR` estima los cuartiles
+bloque a bloque con `QuantileSketch` (un sketch tipo KLL de tamaño acotado y
+combinable entre particiones); `ColumnSketches` mantiene un sketch por
+columna y es la base que comparte con los rangos de Spearman
+(campaign_analytics.correlation). Los límites aproximados sirven luego para un
+conteo exacto en una segunda pasada con `count_outliers`.
+`streaming_outliers` elige entre las dos formas según lleguen uno o varios
+bloques.
+"""
+
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+# Factor de Tukey: fuera de [Q1 - k·IQR, Q3 + k·IQR] es outlier
+IQR_FACTOR = 1.5
+QUARTILES = (0.25, 0.75)
+# Elementos que conserva cada nivel del sketch; el error de rango es ~1/k
+SKETCH_SIZE = 200
+
+
+def _numeric_matrix(df, columns):
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    columns = list(columns)
+    return columns, df[columns].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def iqr_bounds(values, k=IQR_FACTOR):
+    """Cuartiles y límites de Tukey de cada columna de una matriz 2D.
+
+    Devuelve (q1, q3, lower, upper) como arrays de una posición por columna.
+    Los NaN se ignoran, igual que en `Series.quantile`.
+    """
+    values = np.asarray(values, dtype='float64')
+    quantile = np.nanquantile if np.isnan(values).any() else np.quantile
+    q1, q3 = quantile(values, QUARTILES, axis=0)
+    iqr = q3 - q1
+    return q1, q3, q1 - k * iqr, q3 + k * iqr
+
+
+def count_outliers(values, lower, upper):
+    """Filas fuera de [lower, upper] por columna (los NaN no cuentan)."""
+    values = np.asarray(values, dtype='float64')
+    return ((values < lower) | (values > upper)).sum(axis=0)
+
+
+def _summary(columns, q1, q3, lower, upper, outliers, n_rows):
+    pct = outliers / n_rows * 100 if n_rows else np.full(len(columns), math.nan)
+    return pd.DataFrame({
+        'q1': q1, 'q3': q3, 'iqr': q3 - q1, 'lower': lower, 'upper': upper,
+        'outliers': np.asarray(outliers, dtype='int64'), 'pct': pct,
+    }, index=pd.Index(columns, name='columna'))
+
+
+def iqr_outliers(df, columns=None, k=IQR_FACTOR):
+    """Resumen de outliers IQR de las columnas numéricas de `df`.
+
+    Una fila por columna con q1, q3, iqr, lower, upper, outliers y pct
+    (porcentaje sobre el total de filas).
+    """
+    columns, values = _numeric_matrix(df, columns)
+    q1, q3, lower, upper = iqr_bounds(values, k)
+    outliers = count_outliers(values, lower, upper)
+    return _summary(columns, q1, q3, lower, upper, outliers, len(df))
+
+
+def streaming_outliers(chunks, columns=None, k=IQR_FACTOR, sketch_size=SKETCH_SIZE):
+    """Resumen de outliers de los bloques que entrega `chunks()` (se llama una vez por pasada).
+
+    Con un solo bloque (el dataset ya cargado, o un archivo chico) es exacto,
+    igual que `iqr_outliers`. Con varios, una pasada estima los cuartiles con
+    `StreamingIQR` y otra cuenta exactamente las filas fuera de esos límites.
+    """
+    blocks = chunks()
+    first = next(blocks, None)
+    second = next(blocks, None) if first is not None else None
+    if second is None:
+        if first is None:
+            empty = np.empty(0)
+            return _summary([], empty, empty, empty, empty, empty, 0)
+        return iqr_outliers(first, columns, k)
+    stream = StreamingIQR(columns, sketch_size, k)
+    for chunk in itertools.chain([first, second], blocks):
+        stream.update(chunk)
+    summary = stream.summary()
+    lower, upper = summary['lower'].to_numpy(), summary['upper'].to_numpy()
+    outliers = np.zeros(len(summary), dtype='int64')
+    for chunk in chunks():
+        outliers += count_outliers(_numeric_matrix(chunk, summary.index)[1], lower, upper)
+    summary['outliers'] = outliers
+    summary['pct'] = outliers / stream.n_rows * 100
+    return summary
+
+
+class QuantileSketch:
+    """Sketch de cuantiles aproximados tipo KLL para una columna.
+
+    Los valores entran al nivel 0; cuando un nivel supera su capacidad se
+    ordena y se promueve uno de cada dos elementos al nivel siguiente, donde
+    cada elemento pesa el doble. La memoria queda en O(k·log(n/k)) y el
+    error de rango en torno a 1/k. Mientras no haya compactado nada, los
+    cuantiles son exactos e interpolados como en pandas.
+    """
+
+    def __init__(self, k=SKETCH_SIZE, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            items = np.sort(items)
+            # Con tamaño impar el último elemento se queda en su nivel
+            keep = items[len(items) - len(items) % 2:]
+            promoted = items[self._rng.integers(2):len(items) - len(keep):2]
+            self.levels[level] = keep
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Al crecer la altura cambian las capacidades; se revisa desde abajo
+            level = 0
+        return self
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Combina el sketch de otra partición en este."""
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        return self._compress()
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Cuantil(es) aproximado(s) para q en [0, 1]."""
+        if self.n == 0:
+            return np.full(np.shape(q), math.nan) if np.ndim(q) else math.nan
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q)
+        items, cumulative = self._weighted()
+        idx = np.searchsorted(cumulative, np.asarray(q) * cumulative[-1], side='left')
+        return items[np.minimum(idx, len(items) - 1)]
+
+    def rank(self, x, inclusive=False):
+        """Fracción estimada de valores < x (o <= x con `inclusive`)."""
+        if self.n == 0:
+            return math.nan
+        items, cumulative = self._weighted()
+        idx = np.searchsorted(items, x, side='right' if inclusive else 'left')
+        below = np.where(idx > 0, cumulative[np.maximum(idx - 1, 0)], 0.0)
+        return below / cumulative[-1]
+
+
+class ColumnSketches:
+    """Un `QuantileSketch` por columna numérica, bloque a bloque.
+
+    `update` recibe bloques (DataFrame) de iter_chunks y `merge` combina
+    particiones; `sketches[col]` es el sketch de cada columna.
+    """
+
+    def __init__(self, columns=None, k=SKETCH_SIZE):
+        self.columns = list(columns) if columns is not None else None
+        self.k = k
+        self.n_rows = 0
+        self.sketches = {}
+
+    def update(self, chunk):
+        columns, values = _numeric_matrix(chunk, self.columns)
+        if self.columns is None:
+            self.columns = columns
+        self.n_rows += len(chunk)
+        for i, col in enumerate(columns):
+            if col not in self.sketches:
+                self.sketches[col] = QuantileSketch(self.k, seed=i)
+            self.sketches[col].update(values[:, i])
+        return self
+
+    def merge(self, other):
+        if self.columns is None:
+            self.columns = other.columns
+        self.n_rows += other.n_rows
+        for col, sketch in other.sketches.items():
+            if col in self.sketches:
+                self.sketches[col].merge(sketch)
+            else:
+                self.sketches[col] = sketch
+        return self
+
+
+class StreamingIQR(ColumnSketches):
+    """Límites IQR aproximados de varias columnas, bloque a bloque.
+
+    `summary` estima los outliers a partir de los rangos del sketch; para un
+    conteo exacto, se recorren de nuevo los bloques con `count_outliers`
+    contra `summary()[['lower', 'upper']]`.
+    """
+
+    def __init__(self, columns=None, k=SKETCH_SIZE, factor=IQR_FACTOR):
+        super().__init__(columns, k)
+        self.factor = factor
+
+    def summary(self):
+        columns = [col for col in self.columns or [] if col in self.sketches]
+        q1, q3 = np.array([self.sketches[col].quantile(QUARTILES) for col in columns],
+                          dtype='float64').reshape(-1, 2).T
+        iqr = q3 - q1
+        lower, upper = q1 - self.factor * iqr, q3 + self.factor * iqr
+        outliers = np.array([
+            round(sketch.n * (sketch.rank(low) + 1 - sketch.rank(high, inclusive=True)))
+            for sketch, low, high in zip((self.sketches[col] for col in columns), lower, upper)
+        ], dtype='int64')
+        return _summary(columns, q1, q3, lower, upper, outliers, self.n_rows)
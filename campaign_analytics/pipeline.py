@@ -0,0 +1,177 @@
+"""Ejecución de las etapas del análisis como un grafo de dependencias (DAG).
+
+Cada `Stage` declara de qué etapas depende, qué archivos produce y de qué
+archivos de código depende su resultado. `Pipeline.run` hace dos cosas:
+
+- Planifica: una etapa con salidas se omite si su clave no cambió y sus
+  archivos siguen siendo los que escribió (mismo hash de contenido: si otro
+  script los reescribió o se borraron, la etapa vuelve a correr). La clave
+  combina la huella del dataset, los parámetros, el contenido de sus
+  fuentes y las claves de sus dependencias. Una etapa sin salidas (carga,
+  métricas) solo corre si alguna etapa que depende de ella va a correr.
+- Ejecuta: las etapas listas corren en paralelo en un pool de hilos. El
+  resultado de cada dependencia se pasa como argumento posicional, así que
+  los datos se cargan una sola vez y se comparten en memoria.
+
+Las claves y el hash de las salidas de la última ejecución correcta se
+guardan en un JSON (`state_path`).
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from campaign_analytics import profiling
+
+
+class Stage:
+    """Una etapa: `func(*resultados_de_deps, **params)`."""
+
+    def __init__(self, name, func, deps=(), outputs=(), sources=(), params=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.outputs = tuple(outputs)
+        self.sources = tuple(sources)
+        self.params = params or {}
+
+
+def _digest_files(paths):
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(path.encode())
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b'<sin archivo>')
+    return digest.hexdigest()
+
+
+def topological_order(stages):
+    """Nombres de las etapas en orden de dependencias; ValueError si hay ciclos."""
+    order, visiting, done = [], set(), set()
+
+    def visit(name, path):
+        if name in done:
+            return
+        if name not in stages:
+            raise ValueError(f"Dependencia desconocida: {name!r} (desde {' -> '.join(path)})")
+        if name in visiting:
+            raise ValueError(f"Ciclo en el pipeline: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in stages[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name, [])
+    return order
+
+
+class Pipeline:
+    """Conjunto de etapas con su estado persistido en `state_path`."""
+
+    def __init__(self, stages, state_path, fingerprint=''):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = topological_order(self.stages)
+        self.state_path = state_path
+        self.fingerprint = fingerprint
+
+    def _read_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp = f'{self.state_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def keys(self):
+        """Clave de cada etapa según sus entradas (no depende de ejecutar nada)."""
+        keys = {}
+        for name in self.order:
+            stage = self.stages[name]
+            payload = json.dumps({
+                'dataset': self.fingerprint,
+                'params': stage.params,
+                'sources': _digest_files(stage.sources),
+                'deps': [keys[dep] for dep in stage.deps],
+            }, sort_keys=True, default=str)
+            keys[name] = hashlib.sha1(payload.encode()).hexdigest()
+        return keys
+
+    def plan(self, targets=None, force=False):
+        """Etapas que hay que correr para producir `targets` (por defecto, todas)."""
+        keys, state = self.keys(), self._read_state()
+        wanted = set(targets or self.order)
+        for name in reversed(self.order):
+            if name in wanted:
+                wanted.update(self.stages[name].deps)
+        needed = set()
+        for name in reversed(self.order):
+            if name not in wanted:
+                continue
+            stage = self.stages[name]
+            if stage.outputs:
+                stale = (force or not all(os.path.exists(path) for path in stage.outputs)
+                         or state.get(name) != self._record(stage, keys[name]))
+            else:
+                stale = any(name in self.stages[other].deps for other in needed)
+            if stale:
+                needed.add(name)
+        return [name for name in self.order if name in needed], keys
+
+    def run(self, targets=None, force=False, workers=None, log=print):
+        """Corre las etapas pendientes y devuelve {etapa: segundos} de las ejecutadas."""
+        to_run, keys = self.plan(targets, force)
+        for name in self.order:
+            if name not in to_run and self.stages[name].outputs and (not targets or name in targets):
+                log(f"⏭  {name}: sin cambios, se omite")
+        state = self._read_state()
+        results, timings, running = {}, {}, {}
+        pending = list(to_run)
+        with ThreadPoolExecutor(max_workers=workers or max(1, len(to_run))) as pool:
+            while pending or running:
+                for name in [n for n in pending if all(d in results for d in self.stages[n].deps
+                                                       if d in to_run)]:
+                    stage = self.stages[name]
+                    args = [results.get(dep) for dep in stage.deps]
+                    running[pool.submit(self._timed, stage, args)] = name
+                    pending.remove(name)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name], timings[name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        self._write_state(state)
+                        raise
+                    log(f"✅ {name}: {timings[name]:.2f} s")
+                    if self.stages[name].outputs:
+                        state[name] = self._record(self.stages[name], keys[name])
+        self._write_state(state)
+        return timings
+
+    @staticmethod
+    def _record(stage, key):
+        """Lo que se guarda de una etapa: su clave y el hash de sus salidas."""
+        return {'key': key, 'outputs': _digest_files(stage.outputs)}
+
+    @staticmethod
+    def _timed(stage, args):
+        start = time.perf_counter()
+        with profiling.stage(f'pipeline:{stage.name}'):
+            result = stage.func(*args, **stage.params)
+        return result, time.perf_counter() - start
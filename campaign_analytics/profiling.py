@@ -0,0 +1,222 @@
+"""Instrumentación liviana por etapa: tiempo real, CPU, pico de RSS y filas.
+
+Se activa con la variable de entorno CAMPANAS_PERFIL (ruta del archivo de
+salida, o 1 para solo imprimir el resumen) o llamando a `enable`. Los
+scripts y el paquete marcan sus etapas con `stage` o con `@profiled`:
+
+    with profiling.stage('carga') as registro:
+        df = load_campaigns()
+        registro['filas'] = len(df)
+
+Al terminar el proceso se imprime un resumen por etapa en stderr y, si se
+dio una ruta, se escribe un JSON en formato Chrome trace (chrome://tracing o
+https://ui.perfetto.dev) con cada etapa como evento y el resumen en
+`otherData`. Las etapas de procesos hijos (las figuras de graficas.py) se
+agregan al mismo archivo con `flush_worker`.
+
+Desactivada, `stage` devuelve un nullcontext (con su propio dict, para que
+anotar 'filas' no se filtre entre llamadas) y `@profiled` solo consulta un
+booleano, así que no agrega costo medible.
+
+El tiempo de CPU es el del proceso (`time.process_time`), que con etapas en
+hilos paralelos (pipeline.py) incluye el trabajo de los otros hilos.
+"""
+
+import atexit
+import contextlib
+import functools
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+ENV_VAR = 'CAMPANAS_PERFIL'
+# El proceso que activó el perfil; los hijos lo heredan por el entorno
+_OWNER_VAR = 'CAMPANAS_PERFIL_PID'
+
+_ENABLED = False
+_PATH = None
+_ORIGIN = time.perf_counter()
+_RECORDS = []
+_LOCK = threading.Lock()
+_DEPTH = threading.local()
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def enabled():
+    return _ENABLED
+
+
+def enable(path=None):
+    """Activa el perfil; `path` es el JSON de salida (None: solo el resumen)."""
+    global _ENABLED, _PATH
+    if _ENABLED:
+        return
+    _ENABLED, _PATH = True, path
+    os.environ.setdefault(ENV_VAR, path or '1')
+    if os.environ.setdefault(_OWNER_VAR, str(os.getpid())) == str(os.getpid()):
+        atexit.register(_finish)
+
+
+@contextlib.contextmanager
+def _measure(name, rows):
+    record = {'etapa': name, 'filas': rows}
+    depth = getattr(_DEPTH, 'value', 0)
+    _DEPTH.value = depth + 1
+    start, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        _DEPTH.value = depth
+        record.update({
+            'inicio_s': start - _ORIGIN,
+            'segundos': time.perf_counter() - start,
+            'cpu_s': time.process_time() - cpu,
+            'rss_pico_mb': _peak_rss_mb(),
+            'nivel': depth,
+            'pid': os.getpid(),
+            'hilo': threading.get_ident(),
+        })
+        with _LOCK:
+            _RECORDS.append(record)
+
+
+def stage(name, rows=None):
+    """Context manager que mide el bloque; devuelve un dict donde anotar 'filas'."""
+    return _measure(name, rows) if _ENABLED else contextlib.nullcontext({})
+
+
+def profiled(name=None):
+    """Decorador equivalente a envolver la función en `stage(name)`."""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with _measure(label, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def records():
+    with _LOCK:
+        return list(_RECORDS)
+
+
+def summary(rows=None):
+    """Totales por etapa (en orden de primera aparición)."""
+    totals = {}
+    for record in rows if rows is not None else records():
+        total = totals.setdefault(record['etapa'], {
+            'etapa': record['etapa'], 'llamadas': 0, 'segundos': 0.0, 'cpu_s': 0.0,
+            'filas': None, 'rss_pico_mb': None})
+        total['llamadas'] += 1
+        total['segundos'] += record['segundos']
+        total['cpu_s'] += record['cpu_s']
+        if record['filas'] is not None:
+            total['filas'] = (total['filas'] or 0) + record['filas']
+        if record['rss_pico_mb'] is not None:
+            total['rss_pico_mb'] = max(total['rss_pico_mb'] or 0.0, record['rss_pico_mb'])
+    return list(totals.values())
+
+
+def format_summary(rows=None):
+    lines = [f"{'etapa':<36} {'llamadas':>8} {'real (s)':>9} {'CPU (s)':>9} {'filas':>12} {'RSS pico (MB)':>14}"]
+    for total in summary(rows):
+        filas = f"{total['filas']:,}" if total['filas'] is not None else '-'
+        rss = f"{total['rss_pico_mb']:.1f}" if total['rss_pico_mb'] is not None else '-'
+        lines.append(f"{total['etapa'][:36]:<36} {total['llamadas']:>8} {total['segundos']:>9.3f} "
+                     f"{total['cpu_s']:>9.3f} {filas:>12} {rss:>14}")
+    return '\n'.join(lines)
+
+
+def _chrome_events(rows):
+    events = []
+    for record in rows:
+        args = {key: record[key] for key in ('filas', 'cpu_s', 'rss_pico_mb') if record[key] is not None}
+        events.append({
+            'name': record['etapa'], 'ph': 'X', 'cat': 'campanas',
+            'ts': round(record['inicio_s'] * 1e6, 1), 'dur': round(record['segundos'] * 1e6, 1),
+            'pid': record['pid'], 'tid': record['hilo'], 'args': args,
+        })
+    return events
+
+
+def write(path, rows=None):
+    """Escribe los registros como Chrome trace con el resumen en otherData."""
+    rows = records() if rows is None else rows
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'traceEvents': _chrome_events(rows),
+            'displayTimeUnit': 'ms',
+            'otherData': {'resumen': summary(rows), 'etapas': rows},
+        }, f, indent=1)
+    return path
+
+
+def _parts_pattern(path):
+    return f'{path}.*.parte'
+
+
+def flush_worker():
+    """En un proceso hijo, deja sus registros para que el proceso principal los junte."""
+    path = os.environ.get(ENV_VAR)
+    if not _ENABLED or path in (None, '1') or os.environ.get(_OWNER_VAR) == str(os.getpid()):
+        return
+    with _LOCK:
+        rows, _RECORDS[:] = list(_RECORDS), []
+    if rows:
+        # perf_counter no es comparable entre procesos: se alinean por reloj de pared
+        offset = time.time() - time.perf_counter()
+        for record in rows:
+            record['inicio_epoch'] = record['inicio_s'] + _ORIGIN + offset
+        # Un worker puede atender varias tareas: se agrega una línea por registro
+        with open(f'{path}.{os.getpid()}.parte', 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + '\n' for record in rows)
+
+
+def _finish():
+    rows = records()
+    if _PATH:
+        offset = time.time() - time.perf_counter() + _ORIGIN
+        for part in sorted(glob.glob(_parts_pattern(_PATH))):
+            with open(part, encoding='utf-8') as f:
+                for record in map(json.loads, f):
+                    record['inicio_s'] = record.pop('inicio_epoch') - offset
+                    rows.append(record)
+            os.remove(part)
+    if not rows:
+        return
+    print('\n' + format_summary(rows), file=sys.stderr)
+    if _PATH:
+        write(_PATH, rows)
+        print(f"Perfil guardado en {_PATH}", file=sys.stderr)
+
+
+def _reset_in_child():
+    # Un hijo creado con fork no debe volver a reportar lo del padre
+    with _LOCK:
+        _RECORDS.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_in_child)
+
+if os.environ.get(ENV_VAR):
+    enable(None if os.environ[ENV_VAR] == '1' else os.environ[ENV_VAR])
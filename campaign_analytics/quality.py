@@ -0,0 +1,251 @@
+"""Calidad de datos en una pasada por bloques: completitud y duplicados.
+
+`df.duplicated()` necesita el DataFrame entero en memoria y compara filas
+completas. Aquí cada fila se reduce una sola vez a un hash de 64 bits
+(`row_hashes`: un hash vectorizado por columna con
+`pd.util.hash_pandas_object`, combinados fila a fila) y los duplicados se
+buscan entre hashes:
+
+- dentro de un bloque, con `duplicated` sobre el array de hashes;
+- contra los bloques anteriores, con un `HashSet` exacto (arrays ordenados
+  de uint64, 8 bytes por fila distinta) o, si se pide, con un filtro de
+  Bloom (`BloomFilter`) de memoria fija por elemento y tasa de falsos
+  positivos acotada.
+
+Con el conjunto exacto el resultado coincide con `df.duplicated()` salvo
+colisiones del hash de 64 bits (probabilidad ~n²/2⁶⁵, despreciable para
+cualquier tamaño razonable). Con Bloom los duplicados pueden sobrestimarse
+como mucho en la tasa de error pedida, nunca subestimarse.
+
+`DataQuality` junta todo: nulos por columna, filas duplicadas y campana_id
+repetidos (por separado, con su propio conjunto de hashes). Con
+CAMPANAS_DUPLICADOS_BLOOM=<error> (por ejemplo 0.001) usa filtros de Bloom
+en vez del conjunto exacto.
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMN = 'campana_id'
+BLOOM_ERROR = float(os.environ.get('CAMPANAS_DUPLICADOS_BLOOM', '0')) or None
+# Elementos del primer filtro de Bloom; los siguientes duplican la capacidad
+BLOOM_CAPACITY = 1_000_000
+
+
+def column_hashes(df, columns=None):
+    """{columna: hash uint64 de cada valor} (las categóricas se hashean por valor, no por código)."""
+    columns = df.columns if columns is None else columns
+    return {col: pd.util.hash_pandas_object(df[col], index=False).to_numpy() for col in columns}
+
+
+def row_hashes(df, columns=None, hashes=None):
+    """Hash uint64 de cada fila de `df` (o de sus `columns`), sin mirar el índice.
+
+    `hashes` permite pasar los hashes por columna ya calculados.
+    """
+    hashes = hashes or column_hashes(df, columns)
+    columns = df.columns if columns is None else columns
+    combined = np.zeros(len(df), dtype='uint64')
+    for col in columns:
+        # Mezclar después de cada columna hace que el orden de los valores importe
+        combined = _remix(combined ^ hashes[col])
+    return combined
+
+
+def _remix(hashes):
+    """Mezcla los bits de cada hash (finalizador de splitmix64).
+
+    Sirve para combinar los hashes de las columnas y como segundo hash del
+    doble hashing del filtro de Bloom.
+    """
+    with np.errstate(over='ignore'):
+        z = hashes ^ (hashes >> np.uint64(30))
+        z = z * np.uint64(0xBF58476D1CE4E5B9)
+        z = z ^ (z >> np.uint64(27))
+        z = z * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+class HashSet:
+    """Conjunto exacto de hashes uint64 guardado en arrays ordenados.
+
+    Cada `add` agrega un array ordenado (una "corrida"); las corridas de
+    tamaño parecido se fusionan, así que hay O(log n) corridas y buscar es
+    un `searchsorted` por corrida.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    @property
+    def nbytes(self):
+        return sum(run.nbytes for run in self.runs)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        """Agrega `hashes` (que no deben estar ya en el conjunto)."""
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.sort(hashes))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            newest = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], newest]), kind='mergesort')
+
+
+class BloomFilter:
+    """Filtro de Bloom para `capacity` elementos con tasa de falsos positivos `error`.
+
+    Usa m = -n·ln(p)/ln(2)² bits y k = m/n·ln(2) posiciones por elemento,
+    derivadas del hash con doble hashing (h1 + i·h2).
+    """
+
+    def __init__(self, capacity, error):
+        self.capacity = capacity
+        self.error = error
+        self.n_bits = max(8, math.ceil(-capacity * math.log(error) / math.log(2) ** 2))
+        self.n_hashes = max(1, round(self.n_bits / capacity * math.log(2)))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype='uint8')
+        self.count = 0
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def _positions(self, hashes):
+        step = _remix(hashes) | np.uint64(1)
+        with np.errstate(over='ignore'):
+            for i in range(self.n_hashes):
+                yield (hashes + np.uint64(i) * step) % np.uint64(self.n_bits)
+
+    def contains(self, hashes):
+        found = np.ones(len(hashes), dtype=bool)
+        for positions in self._positions(hashes):
+            found &= (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype('uint8')) & 1 == 1
+        return found
+
+    def add(self, hashes):
+        for positions in self._positions(hashes):
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                             np.left_shift(1, (positions & np.uint64(7)).astype('uint8')).astype('uint8'))
+        self.count += len(hashes)
+
+
+class ScalableBloom:
+    """Filtros de Bloom encadenados que crecen con los datos (Almeida et al., 2007).
+
+    Cuando un filtro llega a su capacidad se agrega otro del doble de
+    capacidad y la mitad de error; la tasa total queda por debajo de `error`.
+    """
+
+    def __init__(self, error, capacity=BLOOM_CAPACITY):
+        self.error = error
+        self.filters = [BloomFilter(capacity, error / 2)]
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def nbytes(self):
+        return sum(bloom.nbytes for bloom in self.filters)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for bloom in self.filters:
+            found |= bloom.contains(hashes)
+        return found
+
+    def add(self, hashes):
+        while len(hashes):
+            current = self.filters[-1]
+            room = current.capacity - current.count
+            if room == 0:
+                self.filters.append(BloomFilter(current.capacity * 2, current.error / 2))
+                continue
+            current.add(hashes[:room])
+            hashes = hashes[room:]
+
+
+class DuplicateFinder:
+    """Marca, bloque a bloque, los hashes que ya aparecieron antes."""
+
+    def __init__(self, bloom_error=None):
+        self.seen = ScalableBloom(bloom_error) if bloom_error else HashSet()
+
+    def update(self, hashes):
+        """Máscara de duplicados de `hashes` (la primera aparición no cuenta)."""
+        duplicated = pd.Index(hashes).duplicated()
+        first = ~duplicated
+        duplicated[first] = self.seen.contains(hashes[first])
+        self.seen.add(hashes[~duplicated])
+        return duplicated
+
+
+class DataQuality:
+    """Nulos por columna, filas duplicadas y claves repetidas de todos los bloques.
+
+    En disco (pickle) se guardan solo los conteos: los conjuntos de hashes se
+    descartan, así que un objeto recuperado de la caché no admite `update`.
+    """
+
+    def __init__(self, key=KEY_COLUMN, bloom_error=BLOOM_ERROR):
+        self.key = key
+        self.bloom_error = bloom_error
+        self.n_rows = 0
+        self.nulls = None
+        self.duplicate_rows = 0
+        self.duplicate_keys = 0
+        self.rows = DuplicateFinder(bloom_error)
+        self.keys = DuplicateFinder(bloom_error)
+
+    @classmethod
+    def from_chunks(cls, chunks, key=KEY_COLUMN, bloom_error=BLOOM_ERROR):
+        quality = cls(key, bloom_error)
+        for chunk in chunks:
+            quality.update(chunk)
+        return quality
+
+    def update(self, chunk):
+        """Incorpora un bloque (DataFrame con todas las columnas a revisar)."""
+        if len(chunk) == 0:
+            return self
+        nulls = chunk.isna().sum()
+        self.nulls = nulls if self.nulls is None else self.nulls.add(nulls, fill_value=0).astype('int64')
+        self.n_rows += len(chunk)
+        # Cada columna se hashea una vez: la clave reutiliza su hash
+        hashes = column_hashes(chunk)
+        self.duplicate_rows += int(self.rows.update(row_hashes(chunk, hashes=hashes)).sum())
+        if self.key in hashes:
+            self.duplicate_keys += int(self.keys.update(hashes[self.key]).sum())
+        return self
+
+    @property
+    def completeness(self):
+        """Porcentaje de valores no nulos por columna."""
+        if self.nulls is None:
+            return pd.Series(dtype='float64')
+        return (1 - self.nulls / self.n_rows) * 100
+
+    @property
+    def duplicate_rows_pct(self):
+        return self.duplicate_rows / self.n_rows * 100 if self.n_rows else 0.0
+
+    @property
+    def duplicate_keys_pct(self):
+        return self.duplicate_keys / self.n_rows * 100 if self.n_rows else 0.0
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.update(rows=None, keys=None)
+        return state
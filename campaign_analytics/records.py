@@ -0,0 +1,187 @@
+"""Almacén compacto de campañas: una columna NumPy por campo, sin objetos Python.
+
+Un DataFrame de campañas ocupa unos 150 bytes por fila, casi todo por
+campana_id como string de Python. `CampaignStore` guarda:
+
+- campana_id como int32 (CAMP-123456 -> 123456; si algún id no tiene esa
+  forma exacta, por ejemplo con ceros a la izquierda, como código sobre una
+  tabla de ids);
+- plataforma, tipo_campana y audiencia_objetivo como códigos int8 sobre
+  su tabla de valores (-1 para los faltantes, que se leen como None);
+- fecha_campana como int32 de días desde 1970-01-01;
+- el resto con los tipos del loader, salvo ctr, conversion_rate y cpc, que
+  se recalculan desde los conteos cuando se piden (metrics.derive).
+
+Eso deja unos 67 bytes por campaña. `record(i)` devuelve una fila en O(1)
+como dict, `top_k` elige los extremos sin ordenar todo (ver
+campaign_analytics.selection) y `to_frame` arma un DataFrame solo con las
+filas pedidas.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.loader import DATE_COLUMN, SCHEMA
+from campaign_analytics.metrics import DERIVED_METRICS, derive
+from campaign_analytics.selection import top_k
+
+ID_COLUMN = 'campana_id'
+ID_PREFIX = 'CAMP-'
+CATEGORY_COLUMNS = [col for col, dtype in SCHEMA.items() if dtype == 'category']
+# Tasas que no se guardan (salen de los conteos); roas y cpa sí, las usa el informe
+COMPUTED_COLUMNS = ['ctr', 'conversion_rate', 'cpc']
+STORED_COLUMNS = [col for col in SCHEMA if col not in COMPUTED_COLUMNS]
+_EPOCH = np.datetime64('1970-01-01', 'D')
+# Solo sin ceros a la izquierda: CAMP-000123 no se puede reconstruir desde 123
+_NUMERIC_ID = rf'{re.escape(ID_PREFIX)}(?:0|[1-9]\d{{0,8}})'
+
+
+def _encode_ids(ids):
+    """(int32, None) si todos son CAMP-<n>; si no, (códigos int32, tabla de ids)."""
+    ids = pd.Series(ids, dtype=object)
+    if ids.str.fullmatch(_NUMERIC_ID, na=False).all():
+        return ids.str.slice(len(ID_PREFIX)).astype('int32').to_numpy(), None
+    codes, table = pd.factorize(ids)
+    return codes.astype('int32'), table.to_numpy(dtype=object)
+
+
+def _take(table, codes):
+    """Valores de `table` para `codes`; el código -1 (faltante) da None."""
+    values = table[np.maximum(codes, 0)] if len(table) else np.full(len(codes), None, dtype=object)
+    return np.where(codes < 0, None, values)
+
+
+def _remap(codes, mapping):
+    """Códigos traducidos con `mapping`; los faltantes (-1) siguen en -1."""
+    remapped = np.full(len(codes), -1, dtype='int64')
+    present = codes >= 0
+    remapped[present] = mapping[codes[present]]
+    return remapped
+
+
+class CampaignStore:
+    """Campañas en arrays columnares de tipo fijo.
+
+    `columns[col]` es el array de cada campo guardado; `categories[col]` la
+    tabla de valores de cada código categórico e `id_table` la de ids (None
+    si los ids son numéricos).
+    """
+
+    def __init__(self, columns, categories, id_table=None):
+        self.columns = columns
+        self.categories = categories
+        self.id_table = id_table
+
+    @classmethod
+    def from_frame(cls, df):
+        columns, categories, id_table = {}, {}, None
+        for col in STORED_COLUMNS:
+            if col not in df.columns:
+                continue
+            values = df[col]
+            if col == ID_COLUMN:
+                columns[col], id_table = _encode_ids(values)
+            elif col in CATEGORY_COLUMNS:
+                codes, levels = (values.cat.codes, values.cat.categories) \
+                    if isinstance(values.dtype, pd.CategoricalDtype) else pd.factorize(values)
+                dtype = 'int8' if len(levels) < 128 else 'int16' if len(levels) < 32768 else 'int32'
+                columns[col] = np.asarray(codes).astype(dtype)
+                categories[col] = np.asarray(levels, dtype=object)
+            elif col == DATE_COLUMN:
+                columns[col] = (values.to_numpy().astype('datetime64[D]') - _EPOCH).astype('int32')
+            else:
+                columns[col] = values.to_numpy(dtype=SCHEMA[col])
+        return cls(columns, categories, id_table)
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        stores = [cls.from_frame(chunk) for chunk in chunks]
+        return cls.concat(stores) if stores else cls.from_frame(pd.DataFrame(columns=STORED_COLUMNS))
+
+    @classmethod
+    def concat(cls, stores):
+        """Une almacenes de bloques (cada uno con sus propias tablas de códigos)."""
+        first = stores[0]
+        columns, categories, id_table = {}, {}, None
+        for col in first.columns:
+            if col in first.categories:
+                levels = pd.Index(np.concatenate([store.categories[col] for store in stores])).unique().sort_values()
+                parts = [_remap(store.columns[col], levels.get_indexer(store.categories[col])) for store in stores]
+                dtype = 'int8' if len(levels) < 128 else 'int16' if len(levels) < 32768 else 'int32'
+                columns[col] = np.concatenate(parts).astype(dtype)
+                categories[col] = levels.to_numpy(dtype=object)
+            elif col == ID_COLUMN and any(store.id_table is not None for store in stores):
+                ids = np.concatenate([store.column(ID_COLUMN) for store in stores])
+                columns[col], id_table = _encode_ids(ids)
+            else:
+                columns[col] = np.concatenate([store.columns[col] for store in stores])
+        return cls(columns, categories, id_table)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @property
+    def nbytes(self):
+        """Bytes de los arrays (las tablas de códigos son despreciables)."""
+        return sum(values.nbytes for values in self.columns.values())
+
+    def _decode(self, col, values):
+        if col in self.categories:
+            return _take(self.categories[col], values)
+        if col == ID_COLUMN:
+            if self.id_table is not None:
+                return _take(self.id_table, values)
+            return np.char.add(ID_PREFIX, values.astype(str)).astype(object)
+        if col == DATE_COLUMN:
+            return (values + _EPOCH).astype('datetime64[ns]')
+        return values
+
+    def column(self, col, rows=None):
+        """Valores de `col` (decodificados) para `rows` (todas por defecto)."""
+        if col in COMPUTED_COLUMNS and col not in self.columns:
+            num, den, _, _ = DERIVED_METRICS[col]
+            inputs = pd.DataFrame({name: self.column(name, rows) for name in (num, den)})
+            return derive(inputs, [col])[col].to_numpy(dtype='float32')
+        values = self.columns[col]
+        return self._decode(col, values if rows is None else values[rows])
+
+    def record(self, i):
+        """La campaña `i` como dict {columna: valor}."""
+        row = {}
+        for col, values in self.columns.items():
+            value = self._decode(col, values[i:i + 1])[0]
+            if col == DATE_COLUMN:
+                value = pd.Timestamp(value)
+            elif isinstance(value, np.generic):
+                value = value.item()
+            row[col] = value
+        return row
+
+    def top_k(self, col, k, largest=True):
+        """Posiciones de las `k` campañas de mayor (o menor) `col` (ver selection.top_k)."""
+        return top_k(self.column(col), k, largest)
+
+    def order(self, col, ascending=True):
+        """Posiciones de todas las campañas ordenadas por `col` (estable)."""
+        values = self.column(col).astype('float64')
+        return np.argsort(values if ascending else -values, kind='stable')
+
+    def to_frame(self, rows=None, columns=None):
+        """DataFrame de `rows` con `columns`, con los tipos del loader."""
+        columns = [col for col in SCHEMA if col in self.columns or col in COMPUTED_COLUMNS] \
+            if columns is None else list(columns)
+        data = {}
+        for col in columns:
+            if col in self.categories:
+                codes = self.columns[col] if rows is None else self.columns[col][rows]
+                data[col] = pd.Categorical.from_codes(codes, categories=self.categories[col])
+            else:
+                data[col] = self.column(col, rows)
+        index = pd.RangeIndex(len(self)) if rows is None else pd.Index(np.asarray(rows))
+        frame = pd.DataFrame(data, index=index)
+        if ID_COLUMN in frame.columns:
+            # El constructor infiere el tipo de texto de pandas; el loader usa object
+            frame[ID_COLUMN] = frame[ID_COLUMN].astype(SCHEMA[ID_COLUMN])
+        return frame
@@ -0,0 +1,386 @@
+"""Plantillas HTML precompiladas para los informes ejecutivos.
+
+Una plantilla se parte una sola vez en texto fijo y campos `{{ nombre }}`.
+Renderizarla es recorrer esas partes y escribirlas en orden, sin concatenar
+strings de forma incremental. Los campos pueden ser texto o un iterable de
+bloques de texto (por ejemplo, las filas de una tabla), que se escriben a
+medida que se generan.
+
+Las filas de las tablas se arman por columnas: cada columna se formatea una
+vez a un arreglo de strings y cada fila sale de aplicar la plantilla de fila
+(precompilada como formato %) a esas columnas, en lugar de recorrer el
+DataFrame con `iterrows()`.
+
+En modo paginado la tabla resumen deja en el HTML solo los extremos del
+ranking; el resto se escribe en fragmentos .js que el navegador carga por
+páginas, de modo que ni el archivo ni el DOM crecen con el número de campañas.
+
+El CSS del informe ejecutivo está en templates/informe_ejecutivo.css: un
+informe suelto lo lleva en línea y los informes por segmento enlazan una
+única copia escrita en su carpeta.
+
+numpy y pandas se importan en las funciones que formatean columnas; las
+constantes y las plantillas se pueden usar sin cargarlos.
+"""
+
+import functools
+import glob
+import html
+import itertools
+import json
+import os
+import re
+
+from campaign_analytics import profiling
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+FIELD = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Filas por bloque al escribir tablas: acota la memoria de los strings
+# intermedios sin hacer un write() por fila.
+ROWS_PER_BLOCK = 10_000
+
+# Modo paginado de la tabla resumen: campañas que quedan en el HTML por cada
+# extremo del ranking y filas por fragmento cargado bajo demanda
+INLINE_ROWS = 50
+PAGE_SIZE = 5_000
+
+# Hoja de estilos del informe ejecutivo (campo `styles` de la plantilla)
+STYLESHEET = 'informe_ejecutivo.css'
+
+
+class Template:
+    """Plantilla con campos `{{ nombre }}`, compilada al construirse."""
+
+    def __init__(self, text):
+        parts = FIELD.split(text)
+        self.literals = parts[0::2]
+        self.fields = parts[1::2]
+        # Misma plantilla como formato %: una fila se arma en una sola llamada
+        self.row_format = '%s'.join(literal.replace('%', '%%') for literal in self.literals)
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def load(cls, name):
+        """Lee (una vez por proceso) una plantilla de campaign_analytics/templates."""
+        with open(os.path.join(TEMPLATE_DIR, name), encoding='utf-8') as f:
+            return cls(f.read())
+
+    def stream(self, context):
+        """Genera las partes del documento en orden."""
+        for literal, field in zip(self.literals, self.fields + [None]):
+            yield literal
+            if field is None:
+                continue
+            value = context[field]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def render(self, context):
+        return ''.join(self.stream(context))
+
+    def write(self, context, path):
+        """Escribe el documento en `path` a medida que se genera."""
+        with profiling.stage('html.escritura'), open(path, 'w', encoding='utf-8') as f:
+            f.writelines(self.stream(context))
+
+    def render_rows(self, columns, rows_per_block=ROWS_PER_BLOCK):
+        """Genera bloques de filas a partir de columnas ya formateadas.
+
+        `columns` asocia cada campo de la plantilla a un arreglo de strings
+        (uno por fila), en el orden en que se escriben las filas.
+        """
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        render = self.row_format.__mod__
+        for start in range(0, n_rows, rows_per_block):
+            stop = min(start + rows_per_block, n_rows)
+            block = zip(*(columns[field][start:stop] for field in self.fields))
+            yield ''.join(map(render, block))
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet():
+    """CSS del informe ejecutivo (leído una vez por proceso)."""
+    with open(os.path.join(TEMPLATE_DIR, STYLESHEET), encoding='utf-8') as f:
+        return f.read()
+
+
+def styles(href=None):
+    """Campo `styles`: la hoja en línea o, con `href`, un enlace a ella.
+
+    Un informe suelto lleva el CSS adentro; los informes por segmento
+    enlazan una sola copia escrita con `write_stylesheet`.
+    """
+    if href is not None:
+        return f'<link rel="stylesheet" href="{html.escape(href)}">'
+    return '<style>\n' + stylesheet() + '    </style>'
+
+
+def write_stylesheet(folder):
+    """Escribe la hoja de estilos en `folder` y devuelve su ruta."""
+    path = os.path.join(folder, STYLESHEET)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(stylesheet())
+    return path
+
+
+def fmt(values, spec):
+    """Formatea una columna numérica con `spec` (mismo mini-lenguaje de format)."""
+    import numpy as np
+
+    formatter = ('{:' + spec + '}').format
+    return np.array(list(map(formatter, np.asarray(values).tolist())), dtype=object)
+
+
+def text(values):
+    """Columna de texto escapada para HTML.
+
+    En columnas categóricas solo se escapan las categorías y luego se
+    expanden por código, así el costo no depende del número de filas.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = np.array([html.escape(str(c)) for c in values.cat.categories] + [''], dtype=object)
+        return categories[np.asarray(values.cat.codes)]
+    values = values.astype(str)
+    if not values.str.contains(r'[&<>"\']').any():
+        return values.to_numpy(dtype=object)
+    return np.array(list(map(html.escape, values.tolist())), dtype=object)
+
+
+def choose(conditions, choices, default):
+    """Columna de strings según condiciones vectorizadas (como np.select)."""
+    import numpy as np
+
+    return np.select(conditions, [np.array(c, dtype=object) for c in choices],
+                     default=np.array(default, dtype=object)).astype(object)
+
+
+# Filas de las tablas del informe (compartidas por ambas versiones)
+PLATFORM_ROW = Template("""
+                    <tr>
+                        <td><strong>{{ plataforma }}</strong></td>
+                        <td>${{ revenue }}</td>
+                        <td>${{ cost }}</td>
+                        <td>{{ conversions }}</td>
+                        <td><span class="positive">{{ roas }}x</span></td>
+                    </tr>
+""")
+
+CAMPAIGN_TYPE_ROW = Template("""
+                    <tr>
+                        <td><strong>{{ tipo_campana }}</strong></td>
+                        <td>{{ conversions }}</td>
+                        <td>${{ revenue }}</td>
+                        <td>${{ cost }}</td>
+                        <td><span class="positive">{{ roas }}x</span></td>
+                    </tr>
+""")
+
+TREND_ROW = Template("""
+                    <tr>
+                        <td><strong>{{ periodo }}</strong></td>
+                        <td>${{ revenue }}</td>
+                        <td>${{ cost }}</td>
+                        <td>{{ roas }}x</td>
+                        <td>{{ roas_7d }}x</td>
+                        <td>{{ roas_28d }}x</td>
+                        <td>${{ cumulative_cost }}</td>
+                        <td>{{ cumulative_roas }}x</td>
+                    </tr>
+""")
+
+CAMPAIGN_ROW = Template("""
+                    <tr style="background: {{ background }};">
+                        <td><strong>{{ campana_id }}</strong></td>
+                        <td>{{ plataforma }}</td>
+                        <td>{{ tipo_campana }}</td>
+                        <td>{{ impresiones }}</td>
+                        <td>{{ conversiones }}</td>
+                        <td>${{ costo_total }}</td>
+                        <td>${{ revenue_generado }}</td>
+                        <td style="color: {{ roas_color }}; font-weight: bold;">{{ roas }}x</td>
+                        <td>${{ cpa }}</td>
+                    </tr>
+""")
+
+
+def platform_rows(platform_analysis):
+    """Filas de la tabla por plataforma (índice: plataforma)."""
+    return PLATFORM_ROW.render_rows({
+        'plataforma': text(platform_analysis.index),
+        'revenue': fmt(platform_analysis['revenue_generado'], ',.0f'),
+        'cost': fmt(platform_analysis['costo_total'], ',.0f'),
+        'conversions': fmt(platform_analysis['conversiones'], 'd'),
+        'roas': fmt(platform_analysis['ROAS'], '.2f'),
+    })
+
+
+def campaign_type_rows(campaign_type_analysis):
+    """Filas de la tabla por tipo de campaña (índice: tipo_campana)."""
+    return CAMPAIGN_TYPE_ROW.render_rows({
+        'tipo_campana': text(campaign_type_analysis.index),
+        'conversions': fmt(campaign_type_analysis['conversiones'], 'd'),
+        'revenue': fmt(campaign_type_analysis['revenue_generado'], ',.0f'),
+        'cost': fmt(campaign_type_analysis['costo_total'], ',.0f'),
+        'roas': fmt(campaign_type_analysis['ROAS'], '.2f'),
+    })
+
+
+def trend_rows(trend):
+    """Filas de la tabla de tendencia mensual (ver timeseries.trend)."""
+    return TREND_ROW.render_rows({
+        'periodo': trend.index.strftime('%m/%Y').to_numpy(dtype=object),
+        'revenue': fmt(trend['revenue_generado'], ',.0f'),
+        'cost': fmt(trend['costo_total'], ',.0f'),
+        'roas': fmt(trend['ROAS'], '.2f'),
+        'roas_7d': fmt(trend['ROAS_7d'], '.2f'),
+        'roas_28d': fmt(trend['ROAS_28d'], '.2f'),
+        'cumulative_cost': fmt(trend['costo_acumulado'], ',.0f'),
+        'cumulative_roas': fmt(trend['ROAS_acumulado'], '.2f'),
+    })
+
+
+def campaign_rows(campaigns_summary):
+    """Filas de la tabla resumen, en el orden de `campaigns_summary`."""
+    roas = campaigns_summary['roas'].to_numpy()
+    return CAMPAIGN_ROW.render_rows({
+        'background': choose([roas < 1], ['#ffe8e8'], 'white'),
+        'campana_id': text(campaigns_summary['campana_id']),
+        'plataforma': text(campaigns_summary['plataforma']),
+        'tipo_campana': text(campaigns_summary['tipo_campana']),
+        'impresiones': fmt(campaigns_summary['impresiones'], ','),
+        'conversiones': fmt(campaigns_summary['conversiones'], 'd'),
+        'costo_total': fmt(campaigns_summary['costo_total'], '.2f'),
+        'revenue_generado': fmt(campaigns_summary['revenue_generado'], '.2f'),
+        'roas_color': choose([roas > 2, roas < 1], ['#27ae60', '#e74c3c'], '#f39c12'),
+        'roas': fmt(roas, '.2f'),
+        'cpa': fmt(campaigns_summary['cpa'], '.2f'),
+    })
+
+
+def kpi_context(kpis, now):
+    """Campos de texto del encabezado, hallazgos y conclusiones del informe."""
+    best_roas = kpis.best_roas_campaign
+    worst_roas = kpis.worst_roas_campaign
+    best_conversion = kpis.best_conversion_campaign
+    return {
+        'period_start': kpis.minimum('fecha_campana').strftime('%d de %B de %Y'),
+        'period_end': kpis.maximum('fecha_campana').strftime('%d de %B de %Y'),
+        'report_date': now.strftime('%d de %B de %Y a las %H:%M'),
+        'n_campaigns': str(kpis.n_rows),
+        'period_days': str(kpis.period_days),
+        'total_revenue': f"{kpis.total_revenue:,.2f}",
+        'total_revenue_rounded': f"{kpis.total_revenue:,.0f}",
+        'total_cost': f"{kpis.total_cost:,.2f}",
+        'total_cost_rounded': f"{kpis.total_cost:,.0f}",
+        'total_conversions': f"{int(kpis.total_conversions):,}",
+        'total_impresiones': f"{int(kpis.total_impresiones):,}",
+        'avg_roas': f"{kpis.avg_roas:.2f}",
+        'avg_roas_gain': f"{kpis.avg_roas - 1:.2f}",
+        'avg_cpa': f"{kpis.avg_cpa:.2f}",
+        'avg_ctr': f"{kpis.avg_ctr:.2f}",
+        'weighted_roas': f"{kpis.weighted_roas:.2f}",
+        'weighted_cpa': f"{kpis.weighted_cpa:.2f}",
+        'weighted_ctr': f"{kpis.weighted_ctr:.2f}",
+        'min_roas': f"{kpis.minimum('roas'):.2f}",
+        'max_roas': f"{kpis.maximum('roas'):.2f}",
+        'ctr_min': f"{kpis.minimum('ctr'):.2f}",
+        'ctr_max': f"{kpis.maximum('ctr'):.2f}",
+        'cpa_min': f"{kpis.minimum('cpa'):.2f}",
+        'cpa_max': f"{kpis.maximum('cpa'):.2f}",
+        'cpa_spread': f"{kpis.maximum('cpa') / kpis.minimum('cpa'):.0f}",
+        'best_roas_id': html.escape(str(best_roas['campana_id'])),
+        'best_roas_platform': html.escape(str(best_roas['plataforma'])),
+        'best_roas_type': html.escape(str(best_roas['tipo_campana'])),
+        'best_roas': f"{best_roas['roas']:.2f}",
+        'best_roas_revenue': f"{best_roas['revenue_generado']:,.2f}",
+        'best_roas_cost': f"{best_roas['costo_total']:,.2f}",
+        'best_conversion_id': html.escape(str(best_conversion['campana_id'])),
+        'best_conversion_conversions': str(int(best_conversion['conversiones'])),
+        'best_conversion_cpa': f"{best_conversion['cpa']:.2f}",
+        'worst_roas_id': html.escape(str(worst_roas['campana_id'])),
+        'worst_roas_platform': html.escape(str(worst_roas['plataforma'])),
+        'worst_roas': f"{worst_roas['roas']:.2f}",
+        'worst_roas_loss': f"{worst_roas['costo_total'] - worst_roas['revenue_generado']:,.2f}",
+        'worst_roas_cost': f"{worst_roas['costo_total']:,.0f}",
+    }
+
+
+# Cuerpo vacío donde el navegador inserta la página de campañas intermedias
+_PAGED_TBODY = """
+                </tbody>
+                <tbody id="campanas-paginadas">
+                </tbody>
+                <tbody>"""
+
+
+def _script_json(value):
+    """JSON apto para incrustar dentro de <script>."""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+def _write_page(folder, page, rows):
+    """Escribe un fragmento `campanas_<page>.js` con filas compactas."""
+    roas = rows['roas'].to_numpy(dtype='float64')
+    data = zip(
+        rows['campana_id'].astype(str).tolist(),
+        rows['plataforma'].cat.codes.tolist(),
+        rows['tipo_campana'].cat.codes.tolist(),
+        rows['impresiones'].tolist(),
+        rows['conversiones'].tolist(),
+        rows['costo_total'].to_numpy(dtype='float64').round(2).tolist(),
+        rows['revenue_generado'].to_numpy(dtype='float64').round(2).tolist(),
+        roas.round(4).tolist(),
+        rows['cpa'].to_numpy(dtype='float64').round(2).tolist(),
+    )
+    with open(os.path.join(folder, f'campanas_{page}.js'), 'w', encoding='utf-8') as f:
+        f.write(f'cargarPaginaCampanas({page},')
+        f.write(json.dumps(list(map(list, data)), separators=(',', ':')))
+        f.write(');\n')
+
+
+def paginated_campaign_rows(campaigns_summary, html_path, page_size=PAGE_SIZE, inline=INLINE_ROWS):
+    """Tabla resumen con los extremos en línea y el resto en fragmentos.
+
+    Deja en el HTML las `inline` primeras y últimas campañas de
+    `campaigns_summary` (ya ordenada) y escribe las intermedias, página por
+    página, en la carpeta `<informe>_datos/` junto al HTML. Devuelve los
+    campos `campaign_rows` y `campaign_pages` de la plantilla.
+    """
+    n_rows = len(campaigns_summary)
+    if n_rows <= 2 * inline:
+        return campaign_rows(campaigns_summary), ''
+
+    summary = campaigns_summary.astype({'plataforma': 'category', 'tipo_campana': 'category'})
+    folder = os.path.splitext(html_path)[0] + '_datos'
+    os.makedirs(folder, exist_ok=True)
+    for old in glob.glob(os.path.join(folder, 'campanas_*.js')):
+        os.remove(old)
+
+    middle = summary.iloc[inline:n_rows - inline]
+    n_pages = -(-len(middle) // page_size)
+    for page in range(n_pages):
+        _write_page(folder, page + 1, middle.iloc[page * page_size:(page + 1) * page_size])
+
+    rows = itertools.chain(
+        campaign_rows(summary.iloc[:inline]),
+        [_PAGED_TBODY],
+        campaign_rows(summary.iloc[n_rows - inline:]),
+    )
+    pager = Template.load('paginacion_campanas.html').render({
+        'n_top': str(inline),
+        'n_bottom': str(inline),
+        'n_paged': f"{len(middle):,}",
+        'page_size': f"{page_size:,}",
+        'n_pages': str(n_pages),
+        'data_dir': _script_json(os.path.basename(folder)),
+        'plataformas': _script_json([str(c) for c in summary['plataforma'].cat.categories]),
+        'tipos': _script_json([str(c) for c in summary['tipo_campana'].cat.categories]),
+    })
+    return rows, pager
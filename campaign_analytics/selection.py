@@ -0,0 +1,98 @@
+"""Las k campañas de mayor o menor valor de una métrica, sin ordenar todo.
+
+Para las campañas destacadas (mejor y peor ROAS, menor CPA, más
+conversiones) no hace falta ordenar el dataset: `np.argpartition` separa los
+k extremos en O(n) y solo esos k se ordenan.
+
+- `top_k` da las posiciones sobre un array o una Series;
+- `extremes` las k filas de menor y de mayor valor de un DataFrame;
+- `TopK` acumula las k mejores bloque a bloque (y entre particiones), así
+  que sirve sobre `iter_chunks` o sobre el estado incremental sin tener todo
+  el dataset en memoria.
+
+Como `nlargest`/`nsmallest`, los faltantes no se eligen y en empates gana la
+fila que aparece primero.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def top_k(values, k, largest=True):
+    """Posiciones de los `k` valores mayores (o menores), de más a menos extremo."""
+    values = np.asarray(values, dtype='float64')
+    valid = np.flatnonzero(~np.isnan(values))
+    keys = -values[valid] if largest else values[valid]
+    k = min(k, len(keys))
+    if k == 0:
+        return np.empty(0, dtype='int64')
+    if k < len(keys):
+        # El corte de argpartition puede dejar fuera empates del k-ésimo: se incluyen todos
+        threshold = keys[np.argpartition(keys, k - 1)[k - 1]]
+        candidates = np.flatnonzero(keys <= threshold)
+    else:
+        candidates = np.arange(len(keys))
+    order = np.lexsort((candidates, keys[candidates]))
+    return valid[candidates[order][:k]]
+
+
+def extremes(df, col, k):
+    """Las `k` filas de menor y de mayor `col`, sin repetir, en orden ascendente."""
+    low = top_k(df[col], k, largest=False)
+    high = top_k(df[col], k, largest=True)
+    # Los altos vienen de mayor a menor: se invierten para dejar todo ascendente
+    rows = np.concatenate([low, high[~np.isin(high, low)][::-1]])
+    return df.iloc[rows]
+
+
+class TopK:
+    """Las `k` filas de mayor (o menor) `col` de todos los bloques vistos.
+
+    Cada bloque se reduce a sus k mejores y se combina con las que ya había,
+    así que la memoria es O(k). El índice de `rows` es la posición global de
+    la fila (en el orden en que llegaron los bloques).
+    """
+
+    def __init__(self, col, k, largest=True, columns=None):
+        self.col = col
+        self.k = k
+        self.largest = largest
+        self.columns = None if columns is None else list(columns)
+        self.rows = None
+        self.seen = 0
+
+    @classmethod
+    def from_chunks(cls, chunks, col, k, largest=True, columns=None):
+        selection = cls(col, k, largest, columns)
+        for chunk in chunks:
+            selection.update(chunk)
+        return selection
+
+    def _keep(self, candidates):
+        self.rows = candidates.iloc[top_k(candidates[self.col], self.k, self.largest)]
+
+    def update(self, chunk):
+        """Incorpora un bloque (DataFrame con `col` y `columns`)."""
+        positions = top_k(chunk[self.col], self.k, self.largest)
+        best = chunk.iloc[positions]
+        if self.columns is not None:
+            best = best[self.columns]
+        best = best.set_axis(pd.Index(self.seen + positions))
+        self.seen += len(chunk)
+        # Las ya elegidas van primero: en empates conservan su lugar
+        self._keep(best if self.rows is None else pd.concat([self.rows, best]))
+        return self
+
+    def merge(self, other):
+        """Combina la selección de una partición posterior (mismos parámetros)."""
+        if (other.col, other.k, other.largest, other.columns) != (self.col, self.k, self.largest, self.columns):
+            raise ValueError(f"Selecciones incompatibles: {self.col}/{self.k} vs {other.col}/{other.k}")
+        if other.rows is not None:
+            rows = other.rows.set_axis(other.rows.index + self.seen)
+            self._keep(rows if self.rows is None else pd.concat([self.rows, rows]))
+        self.seen += other.seen
+        return self
+
+    def result(self):
+        """Las filas elegidas, de la más a la menos extrema."""
+        return self.rows.copy() if self.rows is not None else pd.DataFrame(columns=self.columns)
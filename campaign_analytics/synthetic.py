@@ -0,0 +1,74 @@
+"""Generador reproducible de datasets de campañas del tamaño que se necesite.
+
+Produce archivos con las 19 columnas de datos_sinteticos.csv, en el mismo
+orden y con el mismo formato (fechas ISO, ids CAMP-<n>, tasas redondeadas
+como en el original). Los ids no se repiten (cada bloque toma el siguiente
+tramo de números, mezclado dentro del bloque), así que los chequeos de
+duplicados y los extremos por campaña no dependen del tamaño. Los conteos
+siguen distribuciones plausibles (el alcance nunca supera las impresiones)
+y las tasas ctr, conversion_rate, cpc, cpa y roas se calculan a partir de
+ellos, así que `metrics.mismatches` no marca ninguna fila.
+
+Se escribe por bloques: la memoria no depende del número de filas. La misma
+semilla (con el mismo tamaño de bloque) genera siempre el mismo archivo.
+"""
+
+import numpy as np
+import pandas as pd
+
+from campaign_analytics.loader import SCHEMA
+from campaign_analytics.metrics import derive
+
+PLATFORMS = ['Facebook Ads', 'Instagram Ads', 'LinkedIn Ads', 'TikTok Ads']
+CAMPAIGN_TYPES = ['Awareness', 'Conversion', 'Engagement', 'Lead Generation', 'Traffic']
+AUDIENCES = ['18-24', '25-34', '35-44', '45-54', '55+']
+DATE_RANGE = ('2025-01-01', '2026-01-31')
+CHUNK_ROWS = 500_000
+# Súbase al cambiar lo que se genera: benchmark.py no reutiliza archivos de otra versión
+VERSION = 2
+# Primer número de campaña (los ids del original tienen al menos 5 dígitos)
+FIRST_ID = 10_000
+
+
+def _chunk(rng, n, dates, first_id):
+    impresiones = rng.integers(1_000, 80_000, n)
+    # CTR log-normal (mediana ~4 %), acotado para que clicks <= impresiones
+    ctr = np.clip(rng.lognormal(np.log(0.04), 0.8, n), 0.001, 0.4)
+    clicks = np.maximum(1, np.round(impresiones * ctr)).astype('int64')
+    conversion = np.clip(rng.lognormal(np.log(0.04), 0.7, n), 0.002, 0.5)
+    conversiones = np.maximum(1, np.round(clicks * conversion)).astype('int64')
+    costo = np.round(clicks * rng.lognormal(np.log(0.3), 0.9, n), 2)
+    costo = np.maximum(costo, 0.01)
+    revenue = np.round(costo * rng.lognormal(np.log(4.0), 0.8, n), 2)
+    df = pd.DataFrame({
+        'fecha_campana': rng.choice(dates, n),
+        'campana_id': np.char.add('CAMP-', rng.permutation(np.arange(first_id, first_id + n)).astype(str)),
+        'plataforma': rng.choice(PLATFORMS, n),
+        'tipo_campana': rng.choice(CAMPAIGN_TYPES, n),
+        'audiencia_objetivo': rng.choice(AUDIENCES, n, p=[0.2, 0.3, 0.25, 0.15, 0.1]),
+        'presupuesto_diario': np.round(rng.uniform(50, 800, n), 2),
+        'impresiones': impresiones,
+        'clicks': clicks,
+        'conversiones': conversiones,
+        'costo_total': costo,
+        'revenue_generado': revenue,
+        # Personas alcanzadas: entre un tercio y el total de las impresiones
+        'alcance': rng.integers(np.maximum(1, impresiones // 3), impresiones + 1),
+        'engagement_rate': np.round(rng.uniform(1, 14, n), 2),
+        'tiempo_conversion_hrs': np.round(rng.uniform(1, 130, n), 1),
+    })
+    for metric, values in derive(df, decimals=True).items():
+        df[metric] = values
+    return df[list(SCHEMA)]
+
+
+def generate(path, n_rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Escribe `n_rows` campañas sintéticas en `path` (CSV) y devuelve la ruta."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(*DATE_RANGE).strftime('%Y-%m-%d').to_numpy()
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(SCHEMA) + '\n')
+        for start in range(0, n_rows, chunk_rows):
+            n = min(chunk_rows, n_rows - start)
+            _chunk(rng, n, dates, FIRST_ID + start).to_csv(f, header=False, index=False)
+    return path
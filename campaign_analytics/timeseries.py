@@ -0,0 +1,116 @@
+"""Series de tiempo de revenue y costo: períodos, ventanas móviles y acumulados.
+
+La base es la suma diaria por fecha_campana, que sale del cubo del núcleo
+(`daily`, sin releer filas) o de un recorrido por bloques
+(`daily_from_chunks`). Sobre esa tabla, de una fila por día con campañas:
+
+- `buckets` agrupa por día, semana (lunes a domingo) o mes;
+- `rolling` da sumas y ROAS en ventanas de N días de calendario, contando
+  los días sin campañas como cero;
+- `expanding` da la inversión, el revenue y el ROAS acumulados;
+- `trend` junta todo por período para el informe.
+
+El ROAS de un período o una ventana es revenue / costo de sus sumas, no el
+promedio de los ROAS de cada campaña.
+"""
+
+import pandas as pd
+
+from campaign_analytics.groupby import GroupCube
+from campaign_analytics.loader import DATE_COLUMN
+
+COLUMNS = ['revenue_generado', 'costo_total']
+# código -> (frecuencia de pandas para to_period, nombre)
+FREQUENCIES = {
+    'D': ('D', 'día'),
+    'W': ('W-SUN', 'semana'),
+    'M': ('M', 'mes'),
+}
+ROLLING_WINDOWS = (7, 28)
+# Elección automática: por día mientras haya pocos días, si no por semana
+# hasta dos años y por mes después
+MAX_DAILY_POINTS = 90
+MAX_WEEKLY_SPAN_DAYS = 730
+
+
+def _roas(revenue, cost):
+    return revenue / cost.where(cost != 0)
+
+
+def daily(cube, columns=COLUMNS):
+    """Sumas por día a partir de un `GroupCube` que tenga fecha_campana como clave."""
+    return cube.sum(DATE_COLUMN, columns)
+
+
+def daily_from_chunks(chunks, columns=COLUMNS):
+    """Sumas por día en una sola pasada sobre bloques (DataFrames)."""
+    return daily(GroupCube.from_chunks(chunks, DATE_COLUMN, columns), columns)
+
+
+def calendar(daily_sums):
+    """Las sumas diarias con todos los días del rango (cero en los días sin campañas)."""
+    if daily_sums.empty:
+        return daily_sums
+    days = pd.date_range(daily_sums.index.min(), daily_sums.index.max(), freq='D', name=DATE_COLUMN)
+    return daily_sums.reindex(days, fill_value=0)
+
+
+def choose_frequency(daily_sums):
+    """'D', 'W' o 'M' según cuántos días y qué rango cubren los datos."""
+    if len(daily_sums) <= MAX_DAILY_POINTS:
+        return 'D'
+    span = (daily_sums.index.max() - daily_sums.index.min()).days
+    return 'W' if span <= MAX_WEEKLY_SPAN_DAYS else 'M'
+
+
+def buckets(daily_sums, freq='M'):
+    """Sumas por período (índice: primer día del período) con su ROAS.
+
+    Por día se devuelven solo los días con campañas, como en la tabla diaria.
+    """
+    period, _ = FREQUENCIES[freq]
+    if freq == 'D':
+        summary = daily_sums.copy()
+    else:
+        starts = daily_sums.index.to_period(period).start_time
+        summary = daily_sums.groupby(pd.Index(starts, name=DATE_COLUMN)).sum()
+    if {'revenue_generado', 'costo_total'} <= set(summary.columns):
+        summary['ROAS'] = _roas(summary['revenue_generado'], summary['costo_total'])
+    return summary
+
+
+def rolling(daily_sums, days, columns=COLUMNS):
+    """Sumas de los últimos `days` días de calendario para cada día, con su ROAS."""
+    window = calendar(daily_sums[columns]).rolling(days, min_periods=1).sum()
+    if {'revenue_generado', 'costo_total'} <= set(columns):
+        window['ROAS'] = _roas(window['revenue_generado'], window['costo_total'])
+    return window
+
+
+def expanding(daily_sums, columns=COLUMNS):
+    """Sumas acumuladas desde el primer día, con el ROAS acumulado."""
+    total = daily_sums[columns].cumsum()
+    if {'revenue_generado', 'costo_total'} <= set(columns):
+        total['ROAS'] = _roas(total['revenue_generado'], total['costo_total'])
+    return total
+
+
+def trend(daily_sums, freq='M', windows=ROLLING_WINDOWS):
+    """Tabla por período: sumas, ROAS, ROAS móvil al cierre y acumulados.
+
+    Columnas: revenue_generado, costo_total, ROAS, ROAS_<N>d por cada
+    ventana, costo_acumulado y ROAS_acumulado.
+    """
+    summary = buckets(daily_sums[COLUMNS], freq)
+    if summary.empty:
+        return summary
+    period, _ = FREQUENCIES[freq]
+    # Valor de cada serie diaria en el último día con datos de cada período
+    closing = daily_sums.index.to_series().groupby(daily_sums.index.to_period(period).start_time).max()
+    closing.index.name = DATE_COLUMN
+    for days in windows:
+        summary[f'ROAS_{days}d'] = rolling(daily_sums, days)['ROAS'].reindex(closing.values).to_numpy()
+    total = expanding(daily_sums).reindex(closing.values)
+    summary['costo_acumulado'] = total['costo_total'].to_numpy()
+    summary['ROAS_acumulado'] = total['ROAS'].to_numpy()
+    return summary
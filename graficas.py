@@ -1,138 +1,371 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Configurar estilo
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (15, 12)
-plt.rcParams['font.size'] = 10
-
-# Leer el archivo CSV
-df = pd.read_csv('datos_sinteticos.csv')
-df['fecha_campana'] = pd.to_datetime(df['fecha_campana'])
-
-# Crear figura con múltiples subplots
-fig = plt.figure(figsize=(16, 14))
-
-# 1. Distribución de ROAS por campaña
-ax1 = plt.subplot(3, 3, 1)
-roas_sorted = df.sort_values('roas')
-colors = ['red' if x < 1 else 'green' for x in roas_sorted['roas']]
-ax1.barh(roas_sorted['campana_id'], roas_sorted['roas'], color=colors, alpha=0.7)
-ax1.axvline(x=1, color='black', linestyle='--', linewidth=2, label='ROAS = 1 (break-even)')
-ax1.set_xlabel('ROAS')
-ax1.set_title('ROAS por Campaña\n(Rojo: Pérdida, Verde: Ganancia)', fontweight='bold')
-ax1.legend()
-
-# 2. Revenue vs Costo Total
-ax2 = plt.subplot(3, 3, 2)
-ax2.scatter(df['costo_total'], df['revenue_generado'], s=200, alpha=0.6, c=df['roas'], cmap='RdYlGn')
-ax2.plot([0, df['costo_total'].max()], [0, df['costo_total'].max()], 'k--', label='Break-even')
-for idx, row in df.iterrows():
-    ax2.annotate(row['campana_id'], (row['costo_total'], row['revenue_generado']), fontsize=7)
-ax2.set_xlabel('Costo Total')
-ax2.set_ylabel('Revenue Generado')
-ax2.set_title('Revenue vs Costo Total\n(Color: ROAS)', fontweight='bold')
-ax2.legend()
-ax2.grid(True, alpha=0.3)
-
-# 3. Performance por Plataforma
-ax3 = plt.subplot(3, 3, 3)
-plataforma_kpis = df.groupby('plataforma')[['revenue_generado', 'costo_total']].sum()
-plataforma_kpis['ROAS'] = plataforma_kpis['revenue_generado'] / plataforma_kpis['costo_total']
-plataforma_kpis['ROAS'].sort_values().plot(kind='barh', ax=ax3, color='steelblue', alpha=0.7)
-ax3.axvline(x=1, color='red', linestyle='--', linewidth=2)
-ax3.set_xlabel('ROAS')
-ax3.set_title('ROAS Promedio por Plataforma', fontweight='bold')
-
-# 4. Conversiones por Tipo de Campaña
-ax4 = plt.subplot(3, 3, 4)
-conversiones_tipo = df.groupby('tipo_campana')['conversiones'].sum().sort_values()
-conversiones_tipo.plot(kind='barh', ax=ax4, color='coral', alpha=0.7)
-ax4.set_xlabel('Total de Conversiones')
-ax4.set_title('Conversiones por Tipo de Campaña', fontweight='bold')
-
-# 5. CTR vs Conversion Rate
-ax5 = plt.subplot(3, 3, 5)
-scatter = ax5.scatter(df['ctr'], df['conversion_rate'], s=200, c=df['roas'], cmap='RdYlGn', alpha=0.6, edgecolors='black')
-for idx, row in df.iterrows():
-    ax5.annotate(row['campana_id'], (row['ctr'], row['conversion_rate']), fontsize=7)
-ax5.set_xlabel('CTR (%)')
-ax5.set_ylabel('Conversion Rate (%)')
-ax5.set_title('CTR vs Conversion Rate\n(Color: ROAS)', fontweight='bold')
-plt.colorbar(scatter, ax=ax5, label='ROAS')
-
-# 6. Distribución de Presupuesto por Plataforma
-ax6 = plt.subplot(3, 3, 6)
-presupuesto_plat = df.groupby('plataforma')['presupuesto_diario'].sum()
-colors_pie = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99']
-ax6.pie(presupuesto_plat, labels=presupuesto_plat.index, autopct='%1.1f%%', colors=colors_pie, startangle=90)
-ax6.set_title('Distribución de Presupuesto\npor Plataforma', fontweight='bold')
-
-# 7. Impresiones vs Clicks
-ax7 = plt.subplot(3, 3, 7)
-ax7.scatter(df['impresiones'], df['clicks'], s=200, alpha=0.6, c=df['ctr'], cmap='viridis')
-ax7.set_xlabel('Impresiones')
-ax7.set_ylabel('Clicks')
-ax7.set_title('Impresiones vs Clicks\n(Color: CTR)', fontweight='bold')
-for idx, row in df.iterrows():
-    ax7.annotate(row['campana_id'], (row['impresiones'], row['clicks']), fontsize=7)
-
-# 8. Engagement Rate por Audiencia
-ax8 = plt.subplot(3, 3, 8)
-engagement_aud = df.groupby('audiencia_objetivo')['engagement_rate'].mean().sort_values()
-engagement_aud.plot(kind='barh', ax=ax8, color='mediumpurple', alpha=0.7)
-ax8.set_xlabel('Engagement Rate Promedio (%)')
-ax8.set_title('Engagement Rate por Audiencia', fontweight='bold')
-
-# 9. CPA por Campaña (Top 10 mejor/peor)
-ax9 = plt.subplot(3, 3, 9)
-cpa_sorted = df.sort_values('cpa')[['campana_id', 'cpa']]
-colors_cpa = ['green' if i < 5 else 'red' for i in range(len(cpa_sorted))]
-ax9.barh(cpa_sorted['campana_id'], cpa_sorted['cpa'], color=colors_cpa, alpha=0.7)
-ax9.set_xlabel('CPA (Costo por Acción)')
-ax9.set_title('CPA por Campaña\n(Verde: Mejor, Rojo: Peor)', fontweight='bold')
-ax9.axvline(x=df['cpa'].mean(), color='black', linestyle='--', linewidth=2, label=f"Promedio: {df['cpa'].mean():.2f}")
-ax9.legend()
-
-plt.tight_layout()
-plt.savefig('analisis_campanas.png', dpi=300, bbox_inches='tight')
-print("✅ Gráfica principal guardada como: analisis_campanas.png")
-
-# GRÁFICA ADICIONAL: Matriz de Correlación
-fig2, ax = plt.subplots(figsize=(12, 10))
-numeric_df = df.select_dtypes(include=[np.number])
-corr_matrix = numeric_df.corr()
-sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='coolwarm', center=0, 
-            square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
-ax.set_title('Matriz de Correlación de Variables', fontweight='bold', fontsize=14)
-plt.tight_layout()
-plt.savefig('matriz_correlacion.png', dpi=300, bbox_inches='tight')
-print("✅ Matriz de correlación guardada como: matriz_correlacion.png")
-
-# GRÁFICA ADICIONAL: Timeline de Campaigns
-fig3, ax = plt.subplots(figsize=(14, 8))
-df_sorted = df.sort_values('fecha_campana')
-ax.plot(df_sorted['fecha_campana'], df_sorted['revenue_generado'], marker='o', linewidth=2, markersize=8, label='Revenue', color='green')
-ax2_twin = ax.twinx()
-ax2_twin.plot(df_sorted['fecha_campana'], df_sorted['costo_total'], marker='s', linewidth=2, markersize=8, label='Costo', color='red', linestyle='--')
-ax.set_xlabel('Fecha de Campaña', fontweight='bold')
-ax.set_ylabel('Revenue Generado ($)', fontweight='bold', color='green')
-ax2_twin.set_ylabel('Costo Total ($)', fontweight='bold', color='red')
-ax.set_title('Timeline: Revenue vs Costo por Fecha de Campaña', fontweight='bold', fontsize=14)
-ax.grid(True, alpha=0.3)
-ax.legend(loc='upper left')
-ax2_twin.legend(loc='upper right')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig('timeline_campanas.png', dpi=300, bbox_inches='tight')
-print("✅ Timeline de campañas guardada como: timeline_campanas.png")
-
-print("\n" + "="*50)
-print("RESUMEN DE GRÁFICAS GENERADAS:")
-print("="*50)
-print("1. analisis_campanas.png - Dashboard con 9 gráficas de análisis integral")
-print("2. matriz_correlacion.png - Heatmap de correlaciones entre variables")
-print("3. timeline_campanas.png - Evolución temporal de revenue vs costo")
-print("\nTodas las gráficas han sido guardadas en la carpeta del proyecto.")
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from campaign_analytics import DATA_PATH, cache, figcache, profiling
+from campaign_analytics.core import open_dataset
+
+# matplotlib, numpy y las utilidades que usan pandas se importan al dibujar,
+# no al cargar el módulo: así el pipeline y --help arrancan sin ellos, y
+# seaborn solo se carga para el heatmap de correlación. Antes de dibujar, cada
+# figura busca en campaign_analytics.figcache un PNG hecho con los mismos
+# datos y parámetros; si lo encuentra no se importa matplotlib
+
+# Súbase al cambiar cómo se dibuja alguna figura, para no servir PNG viejos de la caché
+FIGURAS_VERSION = 1
+DPI = 300
+
+# Columnas que necesita cada figura: cada proceso lee solo las suyas. Las del
+# dashboard cubren también el cubo del núcleo (paneles 3, 4, 6 y 8), para
+# construirlo sobre la misma carga si aún no está en disco
+DASHBOARD_COLUMNS = ['fecha_campana', 'campana_id', 'plataforma', 'tipo_campana', 'audiencia_objetivo',
+                     'presupuesto_diario', 'impresiones', 'clicks', 'conversiones',
+                     'costo_total', 'revenue_generado', 'alcance', 'engagement_rate', 'ctr',
+                     'conversion_rate', 'cpa', 'roas']
+
+# Modo escalable del dashboard: a partir de este número de campañas los
+# paneles por campaña pasan a top/bottom-K, los scatter a densidad (hexbin)
+# y solo se anotan los extremos
+UMBRAL_FILAS = 2_000
+TOP_K = 15
+N_ANOTADAS = 3
+GRIDSIZE = 40
+# Columnas que el dashboard dibuja directamente (las demás entran por el cubo)
+DASHBOARD_DIBUJO = ['campana_id', 'costo_total', 'revenue_generado', 'roas', 'ctr', 'conversion_rate',
+                    'impresiones', 'clicks', 'cpa']
+
+# El estilo "whitegrid" de seaborn como parámetros de matplotlib, para no
+# importar seaborn en las figuras que no lo usan
+ESTILO_WHITEGRID = {
+    'axes.axisbelow': True,
+    'axes.edgecolor': '.8',
+    'axes.facecolor': 'white',
+    'axes.grid': True,
+    'axes.labelcolor': '.15',
+    'axes.spines.bottom': True,
+    'axes.spines.left': True,
+    'axes.spines.right': True,
+    'axes.spines.top': True,
+    'figure.facecolor': 'white',
+    'font.family': ['sans-serif'],
+    'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans', 'Bitstream Vera Sans', 'sans-serif'],
+    'grid.color': '.8',
+    'grid.linestyle': '-',
+    'lines.solid_capstyle': 'round',
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+    'text.color': '.15',
+    'xtick.bottom': False,
+    'xtick.color': '.15',
+    'xtick.direction': 'out',
+    'xtick.top': False,
+    'ytick.color': '.15',
+    'ytick.direction': 'out',
+    'ytick.left': False,
+    'ytick.right': False,
+}
+
+
+def configurar_estilo():
+    """Estilo común; se aplica en cada proceso antes de dibujar y devuelve pyplot.
+
+    El backend es siempre Agg: las figuras solo se guardan a archivo.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.rcParams.update(ESTILO_WHITEGRID)
+    plt.rcParams['figure.figsize'] = (15, 12)
+    plt.rcParams['font.size'] = 10
+    return plt
+
+
+def clave_figura(nombre, *entradas):
+    """Clave de la figura en la caché: lo que se dibuja, el estilo y la versión del dibujo."""
+    return figcache.key(nombre, FIGURAS_VERSION, DPI, ESTILO_WHITEGRID, *entradas)
+
+
+def anotar(ax, df, x, y, col, n=N_ANOTADAS):
+    """Anota con su campana_id solo las campañas extremas según `col`."""
+    from campaign_analytics import selection
+
+    filas = selection.extremes(df, col, n)
+    for campana, px, py in zip(filas['campana_id'], filas[x], filas[y]):
+        ax.annotate(campana, (px, py), fontsize=7)
+
+
+@profiling.profiled('figura:dashboard')
+def grafica_dashboard(datos, path='analisis_campanas.png', modo='auto'):
+    """Dashboard con las 9 gráficas de análisis integral.
+
+    `modo` elige entre dibujar cada campaña ('detalle'), agregar ('agregado')
+    o decidir según UMBRAL_FILAS ('auto').
+    """
+    df = datos.frame(DASHBOARD_COLUMNS)
+    agregado = modo == 'agregado' or (modo == 'auto' and len(df) > UMBRAL_FILAS)
+    plataforma_kpis = datos.table('platform_summary')
+    conversiones_tipo = datos.table('campaign_type_summary')['conversiones'].sort_values()
+    engagement_aud = datos.table('audience_engagement').sort_values()
+    clave = clave_figura('dashboard', agregado, TOP_K, N_ANOTADAS, GRIDSIZE, df[DASHBOARD_DIBUJO],
+                         plataforma_kpis[['ROAS', 'presupuesto_diario']], conversiones_tipo, engagement_aud)
+    if figcache.restore(datos.path, 'dashboard', clave, path):
+        return path
+
+    import numpy as np
+    from campaign_analytics import selection
+
+    plt = configurar_estilo()
+    fig = plt.figure(figsize=(16, 14))
+
+    # 1. Distribución de ROAS por campaña
+    ax1 = plt.subplot(3, 3, 1)
+    roas_sorted = selection.extremes(df, 'roas', TOP_K) if agregado else df.sort_values('roas')
+    colors = ['red' if x < 1 else 'green' for x in roas_sorted['roas']]
+    ax1.barh(roas_sorted['campana_id'], roas_sorted['roas'], color=colors, alpha=0.7)
+    ax1.axvline(x=1, color='black', linestyle='--', linewidth=2, label='ROAS = 1 (break-even)')
+    ax1.set_xlabel('ROAS')
+    if agregado:
+        ax1.set_title(f'ROAS: {TOP_K} Peores y {TOP_K} Mejores Campañas\n(Rojo: Pérdida, Verde: Ganancia)', fontweight='bold')
+    else:
+        ax1.set_title('ROAS por Campaña\n(Rojo: Pérdida, Verde: Ganancia)', fontweight='bold')
+    ax1.legend()
+
+    # 2. Revenue vs Costo Total
+    ax2 = plt.subplot(3, 3, 2)
+    if agregado:
+        ax2.hexbin(df['costo_total'], df['revenue_generado'], C=df['roas'], reduce_C_function=np.mean,
+                   gridsize=GRIDSIZE, cmap='RdYlGn', mincnt=1)
+    else:
+        ax2.scatter(df['costo_total'], df['revenue_generado'], s=200, alpha=0.6, c=df['roas'], cmap='RdYlGn')
+    ax2.plot([0, df['costo_total'].max()], [0, df['costo_total'].max()], 'k--', label='Break-even')
+    if agregado:
+        anotar(ax2, df, 'costo_total', 'revenue_generado', 'roas')
+    else:
+        for campana, px, py in zip(df['campana_id'], df['costo_total'], df['revenue_generado']):
+            ax2.annotate(campana, (px, py), fontsize=7)
+    ax2.set_xlabel('Costo Total')
+    ax2.set_ylabel('Revenue Generado')
+    ax2.set_title('Revenue vs Costo Total\n(Color: ROAS)', fontweight='bold')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    # 3. Performance por Plataforma
+    ax3 = plt.subplot(3, 3, 3)
+    plataforma_kpis['ROAS'].sort_values().plot(kind='barh', ax=ax3, color='steelblue', alpha=0.7)
+    ax3.axvline(x=1, color='red', linestyle='--', linewidth=2)
+    ax3.set_xlabel('ROAS')
+    ax3.set_title('ROAS Promedio por Plataforma', fontweight='bold')
+
+    # 4. Conversiones por Tipo de Campaña
+    ax4 = plt.subplot(3, 3, 4)
+    conversiones_tipo.plot(kind='barh', ax=ax4, color='coral', alpha=0.7)
+    ax4.set_xlabel('Total de Conversiones')
+    ax4.set_title('Conversiones por Tipo de Campaña', fontweight='bold')
+
+    # 5. CTR vs Conversion Rate
+    ax5 = plt.subplot(3, 3, 5)
+    if agregado:
+        scatter = ax5.hexbin(df['ctr'], df['conversion_rate'], C=df['roas'], reduce_C_function=np.mean,
+                             gridsize=GRIDSIZE, cmap='RdYlGn', mincnt=1)
+        anotar(ax5, df, 'ctr', 'conversion_rate', 'roas')
+    else:
+        scatter = ax5.scatter(df['ctr'], df['conversion_rate'], s=200, c=df['roas'], cmap='RdYlGn', alpha=0.6, edgecolors='black')
+        for campana, px, py in zip(df['campana_id'], df['ctr'], df['conversion_rate']):
+            ax5.annotate(campana, (px, py), fontsize=7)
+    ax5.set_xlabel('CTR (%)')
+    ax5.set_ylabel('Conversion Rate (%)')
+    ax5.set_title('CTR vs Conversion Rate\n(Color: ROAS)', fontweight='bold')
+    plt.colorbar(scatter, ax=ax5, label='ROAS')
+
+    # 6. Distribución de Presupuesto por Plataforma
+    ax6 = plt.subplot(3, 3, 6)
+    presupuesto_plat = plataforma_kpis['presupuesto_diario']
+    colors_pie = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99']
+    ax6.pie(presupuesto_plat, labels=presupuesto_plat.index, autopct='%1.1f%%', colors=colors_pie, startangle=90)
+    ax6.set_title('Distribución de Presupuesto\npor Plataforma', fontweight='bold')
+
+    # 7. Impresiones vs Clicks
+    ax7 = plt.subplot(3, 3, 7)
+    if agregado:
+        ax7.hexbin(df['impresiones'], df['clicks'], C=df['ctr'], reduce_C_function=np.mean,
+                   gridsize=GRIDSIZE, cmap='viridis', mincnt=1)
+    else:
+        ax7.scatter(df['impresiones'], df['clicks'], s=200, alpha=0.6, c=df['ctr'], cmap='viridis')
+    ax7.set_xlabel('Impresiones')
+    ax7.set_ylabel('Clicks')
+    ax7.set_title('Impresiones vs Clicks\n(Color: CTR)', fontweight='bold')
+    if agregado:
+        anotar(ax7, df, 'impresiones', 'clicks', 'ctr')
+    else:
+        for campana, px, py in zip(df['campana_id'], df['impresiones'], df['clicks']):
+            ax7.annotate(campana, (px, py), fontsize=7)
+
+    # 8. Engagement Rate por Audiencia
+    ax8 = plt.subplot(3, 3, 8)
+    engagement_aud.plot(kind='barh', ax=ax8, color='mediumpurple', alpha=0.7)
+    ax8.set_xlabel('Engagement Rate Promedio (%)')
+    ax8.set_title('Engagement Rate por Audiencia', fontweight='bold')
+
+    # 9. CPA por Campaña (Top 10 mejor/peor)
+    ax9 = plt.subplot(3, 3, 9)
+    if agregado:
+        cpa_sorted = selection.extremes(df[['campana_id', 'cpa']], 'cpa', TOP_K)
+        colors_cpa = ['green' if i < TOP_K else 'red' for i in range(len(cpa_sorted))]
+    else:
+        cpa_sorted = df.sort_values('cpa')[['campana_id', 'cpa']]
+        colors_cpa = ['green' if i < 5 else 'red' for i in range(len(cpa_sorted))]
+    ax9.barh(cpa_sorted['campana_id'], cpa_sorted['cpa'], color=colors_cpa, alpha=0.7)
+    ax9.set_xlabel('CPA (Costo por Acción)')
+    if agregado:
+        ax9.set_title(f'CPA: {TOP_K} Mejores y {TOP_K} Peores Campañas\n(Verde: Mejor, Rojo: Peor)', fontweight='bold')
+    else:
+        ax9.set_title('CPA por Campaña\n(Verde: Mejor, Rojo: Peor)', fontweight='bold')
+    ax9.axvline(x=df['cpa'].mean(), color='black', linestyle='--', linewidth=2, label=f"Promedio: {df['cpa'].mean():.2f}")
+    ax9.legend()
+
+    plt.tight_layout()
+    with profiling.stage('savefig'):
+        plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close(fig)
+    figcache.store(datos.path, 'dashboard', clave, path)
+    return path
+
+
+@profiling.profiled('figura:correlacion')
+def grafica_correlacion(datos, path='matriz_correlacion.png', metodo='pearson'):
+    """Heatmap de correlaciones entre las variables numéricas (Pearson o Spearman).
+
+    La matriz se acumula bloque a bloque: no hace falta cargar el dataset.
+    """
+    corr_matrix = datos.table('correlation' if metodo == 'pearson' else 'spearman_correlation')
+    clave = clave_figura('correlacion', metodo, corr_matrix)
+    if figcache.restore(datos.path, 'correlacion', clave, path):
+        return path
+
+    import seaborn as sns
+
+    plt = configurar_estilo()
+    fig2, ax = plt.subplots(figsize=(12, 10))
+    sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='coolwarm', center=0, 
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
+    titulo = 'Matriz de Correlación de Variables' if metodo == 'pearson' else 'Matriz de Correlación de Spearman'
+    ax.set_title(titulo, fontweight='bold', fontsize=14)
+    plt.tight_layout()
+    with profiling.stage('savefig'):
+        plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close(fig2)
+    figcache.store(datos.path, 'correlacion', clave, path)
+    return path
+
+
+@profiling.profiled('figura:timeline')
+def grafica_timeline(datos, path='timeline_campanas.png', periodo='auto'):
+    """Revenue vs costo sumados por día, semana o mes ('D', 'W', 'M' o 'auto').
+
+    Las sumas salen de la tabla diaria del núcleo (el cubo), sin ordenar ni
+    cargar las filas; 'auto' elige el período con timeseries.choose_frequency.
+    """
+    from campaign_analytics import timeseries
+
+    diario = datos.table('daily_summary')
+    periodo = timeseries.choose_frequency(diario) if periodo == 'auto' else periodo
+    serie = timeseries.buckets(diario, periodo)
+    clave = clave_figura('timeline', periodo, serie[['revenue_generado', 'costo_total']])
+    if figcache.restore(datos.path, 'timeline', clave, path):
+        return path
+
+    plt = configurar_estilo()
+    fig3, ax = plt.subplots(figsize=(14, 8))
+    ax.plot(serie.index, serie['revenue_generado'], marker='o', linewidth=2, markersize=8, label='Revenue', color='green')
+    ax2_twin = ax.twinx()
+    ax2_twin.plot(serie.index, serie['costo_total'], marker='s', linewidth=2, markersize=8, label='Costo', color='red', linestyle='--')
+    ax.set_xlabel('Fecha de Campaña', fontweight='bold')
+    ax.set_ylabel('Revenue Generado ($)', fontweight='bold', color='green')
+    ax2_twin.set_ylabel('Costo Total ($)', fontweight='bold', color='red')
+    if periodo == 'D':
+        ax.set_title('Timeline: Revenue vs Costo por Fecha de Campaña', fontweight='bold', fontsize=14)
+    else:
+        ax.set_title(f'Timeline: Revenue vs Costo por {timeseries.FREQUENCIES[periodo][1].capitalize()}',
+                     fontweight='bold', fontsize=14)
+    ax.grid(True, alpha=0.3)
+    ax.legend(loc='upper left')
+    ax2_twin.legend(loc='upper right')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    with profiling.stage('savefig'):
+        plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close(fig3)
+    figcache.store(datos.path, 'timeline', clave, path)
+    return path
+
+
+# nombre -> (función, mensaje)
+FIGURAS = {
+    'dashboard': (grafica_dashboard, "✅ Gráfica principal guardada como: {}"),
+    'correlacion': (grafica_correlacion, "✅ Matriz de correlación guardada como: {}"),
+    'timeline': (grafica_timeline, "✅ Timeline de campañas guardada como: {}"),
+}
+
+
+def generar_figura(nombre, data_path=DATA_PATH, **opciones):
+    """Dibuja una figura leyendo solo lo que necesita (punto de entrada de cada proceso)."""
+    funcion, _ = FIGURAS[nombre]
+    try:
+        return funcion(open_dataset(data_path), **opciones)
+    finally:
+        profiling.flush_worker()
+
+
+def generar_figuras(procesos=1, opciones=None, datos=None, data_path=DATA_PATH, contexto=None):
+    """Dibuja todas las figuras y devuelve {nombre: ruta}.
+
+    Con `procesos` <= 1 se dibujan en este proceso sobre `datos` (o el
+    dataset de `data_path`); si no, cada figura va a un proceso propio,
+    creado con el `contexto` de multiprocessing indicado.
+    """
+    opciones = opciones or {}
+    if procesos <= 1:
+        # Un solo proceso: las figuras comparten las cargas y tablas del dataset.
+        # Se carga lo del dashboard (que cubre el cubo); la correlación va por bloques
+        datos = datos or open_dataset(data_path)
+        datos.frame(DASHBOARD_COLUMNS)
+        return {nombre: funcion(datos, **opciones.get(nombre, {})) for nombre, (funcion, _) in FIGURAS.items()}
+    # La caché se construye antes de repartir, para que los procesos solo la lean
+    if cache.available():
+        cache.ensure(data_path)
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        futuros = {nombre: pool.submit(generar_figura, nombre, data_path, **opciones.get(nombre, {}))
+                   for nombre in FIGURAS}
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera las gráficas de análisis de campañas.')
+    parser.add_argument('--procesos', type=int, default=min(len(FIGURAS), os.cpu_count() or 1),
+                        help='procesos en paralelo, uno por figura (1 = todo en este proceso)')
+    parser.add_argument('--modo', choices=['auto', 'detalle', 'agregado'], default='auto',
+                        help=f'paneles por campaña o agregados; auto agrega desde {UMBRAL_FILAS:,} campañas')
+    parser.add_argument('--correlacion', choices=['pearson', 'spearman'], default='pearson',
+                        help='coeficiente del heatmap (spearman usa rangos aproximados)')
+    parser.add_argument('--periodo', choices=['auto', 'D', 'W', 'M'], default='auto',
+                        help='agrupación del timeline: día, semana o mes (auto según el rango de fechas)')
+    args = parser.parse_args()
+    rutas = generar_figuras(args.procesos, {'dashboard': {'modo': args.modo},
+                                            'correlacion': {'metodo': args.correlacion},
+                                            'timeline': {'periodo': args.periodo}})
+
+    for nombre, (_, mensaje) in FIGURAS.items():
+        print(mensaje.format(rutas[nombre]))
+
+    print("\n" + "="*50)
+    print("RESUMEN DE GRÁFICAS GENERADAS:")
+    print("="*50)
+    print("1. analisis_campanas.png - Dashboard con 9 gráficas de análisis integral")
+    print("2. matriz_correlacion.png - Heatmap de correlaciones entre variables")
+    print("3. timeline_campanas.png - Evolución temporal de revenue vs costo")
+    print("\nTodas las gráficas han sido guardadas en la carpeta del proyecto.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,72 +1,98 @@
-import pandas as pd
-import numpy as np
-
-# Leer el archivo CSV
-df = pd.read_csv('datos_sinteticos.csv')
-
-# Convertir columnas de fecha a datetime
-df['fecha_campana'] = pd.to_datetime(df['fecha_campana'])
-
-# Mostrar información básica
-print("=" * 50)
-print("INFORMACIÓN DEL DATASET")
-print("=" * 50)
-print(f"\nForma del dataset: {df.shape}")
-print(f"\nPrimeras filas:\n{df.head()}")
-
-# Información general
-print(f"\nTipos de datos:\n{df.dtypes}")
-print(f"\nValores nulos:\n{df.isnull().sum()}")
-
-# Estadísticas descriptivas (solo columnas numéricas)
-print(f"\nEstadísticas descriptivas:\n{df.describe()}")
-
-# Información de columnas
-print(f"\nNombres de columnas: {df.columns.tolist()}")
-print(f"\nTotal de registros: {len(df)}")
-
-# ANÁLISIS AVANZADO PARA TOMA DE DECISIONES
-print("\n" + "=" * 50)
-print("INDICADORES CLAVE DE DESEMPEÑO (KPIs)")
-print("=" * 50)
-
-# 1. Análisis de distribución y variabilidad
-print("\n1. MEDIDAS DE DISPERSIÓN:")
-numeric_df = df.select_dtypes(include=[np.number])
-print(f"Desviación estándar:\n{numeric_df.std().round(3)}")
-print(f"\nCoeficiente de variación (%):\n{(numeric_df.std() / numeric_df.mean() * 100).round(2)}")
-
-# 2. Detección de outliers
-print("\n2. ANÁLISIS DE OUTLIERS (IQR):")
-for col in df.select_dtypes(include=[np.number]).columns:
-    Q1 = df[col].quantile(0.25)
-    Q3 = df[col].quantile(0.75)
-    IQR = Q3 - Q1
-    outliers = df[(df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)]
-    print(f"{col}: {len(outliers)} outliers ({len(outliers)/len(df)*100:.2f}%)")
-
-# 3. Correlación entre variables
-print("\n3. CORRELACIÓN ENTRE VARIABLES:")
-numeric_df = df.select_dtypes(include=[np.number])
-if len(numeric_df.columns) > 1:
-    print(numeric_df.corr().round(3))
-
-# 4. Análisis de frecuencias (variables categóricas)
-print("\n4. DISTRIBUCIÓN DE VARIABLES CATEGÓRICAS:")
-for col in df.select_dtypes(include=['object']).columns:
-    print(f"\n{col}:")
-    print(df[col].value_counts())
-
-# 5. Indicadores de calidad de datos
-print("\n5. CALIDAD DE DATOS:")
-completitud = (1 - df.isnull().sum() / len(df)) * 100
-print(f"Completitud por columna (%):\n{completitud.round(2)}")
-print(f"\nTasa de duplicados: {df.duplicated().sum()} ({df.duplicated().sum()/len(df)*100:.2f}%)")
-
-# 6. Resumen ejecutivo
-print("\n" + "=" * 50)
-print("RESUMEN EJECUTIVO")
-print("=" * 50)
-print(f"Registros válidos: {len(df)}")
-print(f"Completitud promedio: {completitud.mean():.2f}%")
-print(f"Dimensionalidad: {len(df.columns)} variables")
\ No newline at end of file
+from campaign_analytics import profiling
+from campaign_analytics.core import open_dataset
+
+
+@profiling.profiled('estadisticas')
+def resumen(datos, salida=None):
+    """Imprime el análisis descriptivo del dataset en `salida` (por defecto, la consola).
+
+    Todo sale de las tablas del núcleo compartido, que se calculan una sola
+    vez recorriendo el archivo por bloques: el dataset no se carga entero.
+    El resumen descriptivo (`dataset_summary`) es exacto con un solo bloque;
+    con varios, los cuartiles son aproximados (ver campaign_analytics.describe).
+    """
+    descripcion = datos.table('dataset_summary')
+    calidad = datos.table('data_quality')
+
+    # Mostrar información básica
+    print("=" * 50, file=salida)
+    print("INFORMACIÓN DEL DATASET", file=salida)
+    print("=" * 50, file=salida)
+    print(f"\nForma del dataset: {descripcion.shape}", file=salida)
+    print(f"\nPrimeras filas:\n{descripcion.head}", file=salida)
+
+    # Información general
+    print(f"\nTipos de datos:\n{descripcion.dtypes}", file=salida)
+    print(f"\nValores nulos:\n{calidad.nulls}", file=salida)
+
+    # Estadísticas descriptivas (solo columnas numéricas)
+    print(f"\nEstadísticas descriptivas:\n{descripcion.stats}", file=salida)
+
+    # Información de columnas
+    print(f"\nNombres de columnas: {descripcion.columns}", file=salida)
+    print(f"\nTotal de registros: {descripcion.n_rows}", file=salida)
+
+    # ANÁLISIS AVANZADO PARA TOMA DE DECISIONES
+    print("\n" + "=" * 50, file=salida)
+    print("INDICADORES CLAVE DE DESEMPEÑO (KPIs)", file=salida)
+    print("=" * 50, file=salida)
+
+    kpis = datos.table('kpis')
+    print(f"\nRevenue total: ${kpis.total_revenue:,.2f}", file=salida)
+    print(f"Inversión total: ${kpis.total_cost:,.2f}", file=salida)
+    print(f"Conversiones: {kpis.total_conversions:,}", file=salida)
+    print(f"ROAS promedio: {kpis.avg_roas:.2f}x | CTR promedio: {kpis.avg_ctr:.2f}% | CPA promedio: ${kpis.avg_cpa:.2f}", file=salida)
+    print(f"ROAS global: {kpis.weighted_roas:.2f}x | CTR global: {kpis.weighted_ctr:.2f}% | CPA global: ${kpis.weighted_cpa:.2f} (razón de totales)", file=salida)
+
+    # 1. Análisis de distribución y variabilidad
+    print("\n1. MEDIDAS DE DISPERSIÓN:", file=salida)
+    print(f"Desviación estándar:\n{descripcion.std.round(3)}", file=salida)
+    print(f"\nCoeficiente de variación (%):\n{(descripcion.std / descripcion.mean * 100).round(2)}", file=salida)
+
+    # 2. Detección de outliers
+    print("\n2. ANÁLISIS DE OUTLIERS (IQR):", file=salida)
+    # Cuartiles de todas las columnas en una sola llamada y conteo vectorizado
+    resumen_outliers = datos.table('outliers')
+    for col, n, pct in zip(resumen_outliers.index, resumen_outliers['outliers'], resumen_outliers['pct']):
+        print(f"{col}: {n} outliers ({pct:.2f}%)", file=salida)
+
+    # 3. Correlación entre variables
+    print("\n3. CORRELACIÓN ENTRE VARIABLES:", file=salida)
+    correlacion = datos.table('correlation')
+    if len(correlacion.columns) > 1:
+        print(correlacion.round(3), file=salida)
+
+    # 4. Análisis de frecuencias (variables categóricas)
+    print("\n4. DISTRIBUCIÓN DE VARIABLES CATEGÓRICAS:", file=salida)
+    for col, frecuencias in descripcion.counts.items():
+        print(f"\n{col}:", file=salida)
+        print(frecuencias, file=salida)
+
+    # 5. Indicadores de calidad de datos
+    print("\n5. CALIDAD DE DATOS:", file=salida)
+    # Nulos y duplicados en una pasada por bloques, con un hash por fila
+    completitud = calidad.completeness
+    print(f"Completitud por columna (%):\n{completitud.round(2)}", file=salida)
+    # Tasas guardadas (ctr, cpa, roas...) contra las recalculadas desde los conteos
+    inconsistentes = datos.table('metric_mismatches')
+    print("Métricas que no coinciden con las recalculadas:", file=salida)
+    for col, n, pct in zip(inconsistentes.index, inconsistentes['filas'], inconsistentes['pct']):
+        print(f"  {col}: {n} filas ({pct:.2f}%)", file=salida)
+    print(f"\nTasa de duplicados: {calidad.duplicate_rows} ({calidad.duplicate_rows_pct:.2f}%)", file=salida)
+    print(f"IDs de campaña repetidos: {calidad.duplicate_keys} ({calidad.duplicate_keys_pct:.2f}%)", file=salida)
+
+    # 6. Resumen ejecutivo
+    print("\n" + "=" * 50, file=salida)
+    print("RESUMEN EJECUTIVO", file=salida)
+    print("=" * 50, file=salida)
+    print(f"Registros válidos: {descripcion.n_rows}", file=salida)
+    print(f"Completitud promedio: {completitud.mean():.2f}%", file=salida)
+    print(f"Dimensionalidad: {len(descripcion.columns)} variables", file=salida)
+
+
+def main():
+    resumen(open_dataset())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import functools
+import multiprocessing
+import os
+import time
+
+from campaign_analytics import DATA_PATH, cache, ingest
+from campaign_analytics.core import fingerprint, open_dataset
+from campaign_analytics.pipeline import Pipeline, Stage
+
+import generar_informe
+import graficas
+
+RESUMEN_FILENAME = 'resumen_estadistico.txt'
+ETAPAS_FINALES = ['estadisticas', 'figuras', 'informe']
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+
+def fuentes(*scripts):
+    """Archivos de código de los que depende una etapa: sus scripts y el paquete."""
+    rutas = [os.path.join(BASE, script) for script in scripts]
+    for carpeta, _, archivos in os.walk(os.path.join(BASE, 'campaign_analytics')):
+        rutas += [os.path.join(carpeta, nombre) for nombre in archivos if nombre.endswith(('.py', '.html', '.css'))]
+    return rutas
+
+
+def cargar(data_path):
+    """Deja lista la caché columnar y abre el dataset, sin cargarlo en memoria.
+
+    Las tablas que leen las etapas se calculan después por bloques
+    (`derivar`). Con un directorio o un glob los archivos se parsean en
+    paralelo y se informa el rendimiento de cada uno.
+    """
+    if cache.available():
+        cache.ensure(data_path)
+        if ingest.is_multi(data_path):
+            ingest.print_throughput(data_path)
+    return open_dataset(data_path)
+
+
+def tablas_de(etapas, correlacion='pearson'):
+    """Tablas del núcleo que leen las `etapas` finales, sin repetir."""
+    por_etapa = {
+        'estadisticas': ['dataset_summary', 'kpis', 'outliers', 'correlation', 'data_quality',
+                         'metric_mismatches'],
+        'figuras': ['platform_summary', 'campaign_type_summary', 'audience_engagement', 'daily_summary',
+                    'correlation' if correlacion == 'pearson' else 'spearman_correlation'],
+        'informe': ['kpis', 'platform_summary', 'campaign_type_summary', 'daily_summary', 'campaigns_by_roas'],
+    }
+    return list(dict.fromkeys(tabla for etapa in etapas for tabla in por_etapa[etapa]))
+
+
+def derivar(datos, tablas=()):
+    """Calcula (o recupera de disco) las `tablas` del núcleo antes de las etapas finales.
+
+    Así las etapas, que corren en hilos, encuentran sus tablas ya hechas.
+    """
+    for nombre in tablas:
+        datos.table(nombre)
+    return datos
+
+
+def estadisticas(datos, path=RESUMEN_FILENAME):
+    # leerdatos trae pandas al importarse: solo se carga si la etapa corre
+    import leerdatos
+
+    with open(path, 'w', encoding='utf-8') as salida:
+        leerdatos.resumen(datos, salida)
+    return path
+
+
+def figuras(datos, procesos=1, modo='auto', correlacion='pearson', periodo='auto'):
+    # Los procesos no heredan los hilos del pipeline: se arrancan limpios
+    metodo = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    opciones = {'dashboard': {'modo': modo}, 'correlacion': {'metodo': correlacion},
+                'timeline': {'periodo': periodo}}
+    return graficas.generar_figuras(procesos, opciones, datos=datos,
+                                    data_path=datos.path, contexto=multiprocessing.get_context(metodo))
+
+
+def informe(datos, **opciones):
+    return generar_informe.generar_informe(datos, **opciones)
+
+
+def construir(args):
+    """DAG: carga -> metricas -> {estadisticas, figuras, informe}."""
+    rutas_png = ['analisis_campanas.png', 'matriz_correlacion.png', 'timeline_campanas.png']
+    # Qué tablas derivar no cambia ningún resultado, así que tampoco entra en la clave
+    tablas = tablas_de(args.etapas or ETAPAS_FINALES, args.correlacion)
+    etapas = [
+        Stage('carga', cargar, params={'data_path': args.datos}),
+        Stage('metricas', functools.partial(derivar, tablas=tablas), deps=['carga']),
+        Stage('estadisticas', estadisticas, deps=['metricas'], outputs=[RESUMEN_FILENAME],
+              sources=fuentes('leerdatos.py')),
+        # procesos no cambia el resultado, así que no entra en la clave
+        Stage('figuras', functools.partial(figuras, procesos=args.procesos), deps=['metricas'],
+              outputs=rutas_png, sources=fuentes('graficas.py'),
+              params={'modo': args.modo, 'correlacion': args.correlacion, 'periodo': args.periodo}),
+        Stage('informe', informe, deps=['metricas'], outputs=[generar_informe.HTML_FILENAME],
+              sources=fuentes('generar_informe.py'),
+              params={'paginar': args.paginar, 'filas_por_pagina': args.filas_por_pagina,
+                      'destacadas': args.destacadas}),
+    ]
+    carpeta = os.path.join(ingest.source_folder(args.datos), cache.CACHE_DIR)
+    estado = os.path.join(carpeta, ingest.source_name(args.datos) + '.pipeline.json')
+    return Pipeline(etapas, estado, fingerprint=fingerprint(args.datos))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Ejecuta el análisis completo (estadísticas, gráficas e informe) en un solo proceso.')
+    parser.add_argument('etapas', nargs='*', metavar='etapa',
+                        help=f"etapas a producir: {', '.join(ETAPAS_FINALES)} (por defecto, todas)")
+    parser.add_argument('--datos', default=DATA_PATH,
+                        help=f'archivo de campañas, o un directorio o glob de CSV diarios (por defecto {DATA_PATH})')
+    parser.add_argument('--forzar', action='store_true',
+                        help='vuelve a correr las etapas aunque sus entradas no hayan cambiado')
+    parser.add_argument('--procesos', type=int, default=min(len(graficas.FIGURAS), os.cpu_count() or 1),
+                        help='procesos para las figuras (1 = en el mismo proceso, compartiendo los datos)')
+    parser.add_argument('--modo', choices=['auto', 'detalle', 'agregado'], default='auto',
+                        help='modo del dashboard (ver graficas.py)')
+    parser.add_argument('--correlacion', choices=['pearson', 'spearman'], default='pearson',
+                        help='coeficiente del heatmap de correlación')
+    parser.add_argument('--periodo', choices=['auto', 'D', 'W', 'M'], default='auto',
+                        help='agrupación del timeline (ver graficas.py)')
+    parser.add_argument('--paginar', action='store_true', help='tabla de campañas paginada (ver generar_informe.py)')
+    parser.add_argument('--filas-por-pagina', type=int, default=generar_informe.report.PAGE_SIZE)
+    parser.add_argument('--destacadas', type=int, default=generar_informe.report.INLINE_ROWS)
+    args = parser.parse_args()
+    for etapa in args.etapas:
+        if etapa not in ETAPAS_FINALES:
+            parser.error(f"etapa desconocida: {etapa!r} (opciones: {', '.join(ETAPAS_FINALES)})")
+
+    inicio = time.perf_counter()
+    tiempos = construir(args).run(targets=args.etapas or None, force=args.forzar)
+    print(f"\nPipeline completo en {time.perf_counter() - inicio:.2f} s "
+          f"({len(tiempos)} etapas ejecutadas)")
+
+
+if __name__ == '__main__':
+    main()